@@ -9,13 +9,15 @@ You can keep these stable if:
 - window is always positioned predictably
 """
 
-from typing import Dict, Tuple
+from types import MappingProxyType
+from typing import Mapping, Tuple
 
 Point = Tuple[int, int]
 
 # Name each click target like a button or UI element.
+# Read-only so clicker.py can safely cache screen positions derived from it.
 
-CLICK_POINTS: Dict[str, Point] = {
+CLICK_POINTS: Mapping[str, Point] = MappingProxyType({
     # Example placeholders
     "AUTO_BUTTON": (1202, 328),
     "DEATH_TO_LOBBY": (641, 409),
@@ -23,4 +25,4 @@ CLICK_POINTS: Dict[str, Point] = {
     "MENU_BUTTON": (46, 68),
     "MENU_LEAVE_BUTTON": (362, 614),
     "MENU_CONFIRM_BUTTON": (640, 500)
-}
+})
@@ -5,10 +5,13 @@ Uses Windows API SendInput for more reliable game interaction.
 This is the most compatible method for games like Roblox.
 """
 
-from typing import Tuple
+from typing import Dict, Tuple
+import threading
 import time
 import ctypes
-from ctypes import windll, Structure, c_long, c_ulong, sizeof, Union, pointer
+from ctypes import windll, Structure, c_long, c_ulong, c_ushort, sizeof, Union, byref
+
+from click_points import CLICK_POINTS
 
 Point = Tuple[int, int]
 
@@ -18,6 +21,11 @@ MOUSEEVENTF_ABSOLUTE = 0x8000
 MOUSEEVENTF_LEFTDOWN = 0x0002
 MOUSEEVENTF_LEFTUP = 0x0004
 MOUSEEVENTF_WHEEL = 0x0800
+KEYEVENTF_KEYUP = 0x0002
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+VK_RETURN = 0x0D
+VK_MENU = 0x12  # Alt
 
 # Structures for SendInput
 class MOUSEINPUT(Structure):
@@ -30,8 +38,17 @@ class MOUSEINPUT(Structure):
         ("dwExtraInfo", ctypes.POINTER(c_ulong))
     ]
 
+class KEYBDINPUT(Structure):
+    _fields_ = [
+        ("wVk", c_ushort),
+        ("wScan", c_ushort),
+        ("dwFlags", c_ulong),
+        ("time", c_ulong),
+        ("dwExtraInfo", ctypes.POINTER(c_ulong))
+    ]
+
 class INPUT_UNION(Union):
-    _fields_ = [("mi", MOUSEINPUT)]
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
 
 class INPUT(Structure):
     _fields_ = [
@@ -39,54 +56,110 @@ class INPUT(Structure):
         ("union", INPUT_UNION)
     ]
 
+_INPUT_SIZE = sizeof(INPUT)
+
+# Resolve the user32 entry points once and declare their signatures,
+# so each call is a direct C call without per-argument type guessing.
+_SendInput = windll.user32.SendInput
+_SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(INPUT), ctypes.c_int]
+_SendInput.restype = ctypes.c_uint
+
+_GetSystemMetrics = windll.user32.GetSystemMetrics
+_GetSystemMetrics.argtypes = [ctypes.c_int]
+_GetSystemMetrics.restype = ctypes.c_int
+
+# Reusable INPUT structures.
+# The constant fields are set once here; the functions below only write
+# the per-call fields (coordinates, wheel amount) before SendInput.
+# The buffers are shared, so every fill + SendInput holds _INPUT_LOCK:
+# a single scan (F1) can run next to the scan loop thread.
+_INPUT_LOCK = threading.Lock()
+_INP_MOVE = INPUT(type=INPUT_MOUSE)
+_INP_MOVE.union.mi.dwFlags = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE
+
+_INP_CLICK = (INPUT * 2)()
+_INP_CLICK[0].type = INPUT_MOUSE
+_INP_CLICK[0].union.mi.dwFlags = MOUSEEVENTF_LEFTDOWN
+_INP_CLICK[1].type = INPUT_MOUSE
+_INP_CLICK[1].union.mi.dwFlags = MOUSEEVENTF_LEFTUP
+
+_INP_WHEEL = INPUT(type=INPUT_MOUSE)
+_INP_WHEEL.union.mi.dwFlags = MOUSEEVENTF_WHEEL
+
+# Move + wiggle + first click sent as one ordered SendInput batch:
+# move, 3 wiggle moves, down, up.
+_INP_SEQ = (INPUT * 6)()
+for _inp in _INP_SEQ[:4]:
+    _inp.type = INPUT_MOUSE
+    _inp.union.mi.dwFlags = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE
+_INP_SEQ[4] = _INP_CLICK[0]
+_INP_SEQ[5] = _INP_CLICK[1]
+
+# Alt down, Enter down, Enter up, Alt up
+_INP_ALT_ENTER = (INPUT * 4)()
+for _inp, (_vk, _flags) in zip(_INP_ALT_ENTER, [
+        (VK_MENU, 0), (VK_RETURN, 0), (VK_RETURN, KEYEVENTF_KEYUP), (VK_MENU, KEYEVENTF_KEYUP)]):
+    _inp.type = INPUT_KEYBOARD
+    _inp.union.ki.wVk = _vk
+    _inp.union.ki.dwFlags = _flags
+
+# Primary screen size used to scale absolute mouse coordinates.
+# Read on the first move, not at import: main.py imports this module before it
+# makes the process DPI aware, and the values read before that are scaled.
+# Call refresh_screen_metrics() after a resolution or DPI change.
+_SCREEN_W = 0
+_SCREEN_H = 0
+
+def refresh_screen_metrics():
+    """Re-read the primary screen size (call after a resolution or DPI change)."""
+    global _SCREEN_W, _SCREEN_H
+    _SCREEN_W = _GetSystemMetrics(0)
+    _SCREEN_H = _GetSystemMetrics(1)
+
 def window_to_screen(win_rect: Tuple[int, int, int, int], pt: Point) -> Point:
     """Convert a window relative point into a screen coordinate."""
     wl, wt, wr, wb = win_rect
     x, y = pt
     return (wl + x, wt + y)
 
+# win_rect -> {CLICK_POINTS name: screen point}
+# Built once per window position so click_by_name skips the per-click math.
+_abs_cache: Dict[Tuple[int, int, int, int], Dict[str, Point]] = {}
+_ABS_CACHE_MAX = 8
+
+def _screen_points(win_rect) -> Dict[str, Point]:
+    """Return every CLICK_POINTS entry converted to screen coords for win_rect."""
+    key = tuple(win_rect)
+    pts = _abs_cache.get(key)
+    if pts is None:
+        if len(_abs_cache) >= _ABS_CACHE_MAX:
+            _abs_cache.clear()
+        wl, wt = key[0], key[1]
+        pts = {name: (wl + x, wt + y) for name, (x, y) in CLICK_POINTS.items()}
+        _abs_cache[key] = pts
+    return pts
+
+def _set_abs(mi: MOUSEINPUT, x: int, y: int):
+    """Write screen pixel (x, y) into mi as absolute coordinates (0-65535 range)."""
+    if not _SCREEN_W:
+        refresh_screen_metrics()
+    mi.dx = int(x * 65535 / _SCREEN_W)
+    mi.dy = int(y * 65535 / _SCREEN_H)
+
 def move_mouse_absolute(x: int, y: int):
     """
     Move mouse using Win32 API SendInput.
     Coordinates are in screen pixels.
     """
-    # Get screen dimensions
-    screen_width = windll.user32.GetSystemMetrics(0)
-    screen_height = windll.user32.GetSystemMetrics(1)
-
-    # Convert to absolute coordinates (0-65535 range)
-    abs_x = int(x * 65535 / screen_width)
-    abs_y = int(y * 65535 / screen_height)
-
-    # Create input structure
-    inp = INPUT()
-    inp.type = 0  # INPUT_MOUSE
-    inp.union.mi = MOUSEINPUT()
-    inp.union.mi.dx = abs_x
-    inp.union.mi.dy = abs_y
-    inp.union.mi.dwFlags = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE
+    with _INPUT_LOCK:
+        _set_abs(_INP_MOVE.union.mi, x, y)
 
-    # Send the input
-    windll.user32.SendInput(1, pointer(inp), sizeof(INPUT))
+        # Send the input
+        _SendInput(1, byref(_INP_MOVE), _INPUT_SIZE)
 
 def click_mouse():
-    """Send a mouse click using Win32 API."""
-    # Mouse down
-    inp_down = INPUT()
-    inp_down.type = 0
-    inp_down.union.mi = MOUSEINPUT()
-    inp_down.union.mi.dwFlags = MOUSEEVENTF_LEFTDOWN
-
-    # Mouse up
-    inp_up = INPUT()
-    inp_up.type = 0
-    inp_up.union.mi = MOUSEINPUT()
-    inp_up.union.mi.dwFlags = MOUSEEVENTF_LEFTUP
-
-    # Send both events
-    windll.user32.SendInput(1, pointer(inp_down), sizeof(INPUT))
-    time.sleep(0.01)
-    windll.user32.SendInput(1, pointer(inp_up), sizeof(INPUT))
+    """Send a mouse click (down + up in one SendInput call) using Win32 API."""
+    _SendInput(2, _INP_CLICK, _INPUT_SIZE)
 
 def click_point(
         win_rect,
@@ -97,6 +170,9 @@ def click_point(
     """
     Click using Win32 API - most reliable for games.
 
+    The move, optional wiggle and first click go out as a single SendInput
+    batch so Windows queues them in order without a syscall per event.
+
     Args:
         win_rect: (left, top, right, bottom) of window in screen coords
         pt: (x, y) point relative to the window
@@ -105,27 +181,58 @@ def click_point(
         wiggle: Whether to wiggle mouse to trigger hover detection
     """
     sx, sy = window_to_screen(win_rect, pt)
+    _click_screen(sx, sy, clicks, delay_ms, wiggle)
 
-    # Move to target position
-    move_mouse_absolute(sx, sy)
-    time.sleep(0.05)
+def click_by_name(
+        win_rect,
+        name: str,
+        clicks: int = 1,
+        delay_ms: int | None = None,
+        wiggle: bool = True):
+    """
+    Click a named CLICK_POINTS target.
+    Same as click_point(win_rect, CLICK_POINTS[name], ...) but the screen
+    position comes from a per-win_rect cache.
+    """
+    sx, sy = _screen_points(win_rect)[name]
+    _click_screen(sx, sy, clicks, delay_ms, wiggle)
 
-    if wiggle:
-        # Small wiggle to trigger game detection
-        move_mouse_absolute(sx + 2, sy + 2)
-        time.sleep(0.02)
-        move_mouse_absolute(sx - 1, sy - 1)
-        time.sleep(0.02)
+def _click_screen(sx: int, sy: int, clicks: int, delay_ms: int | None, wiggle: bool):
+    """Move to screen point (sx, sy) and click; shared by click_point and click_by_name."""
+    if clicks <= 0:
         move_mouse_absolute(sx, sy)
-        time.sleep(0.05)
+        return
 
-    # Perform clicks
+    with _INPUT_LOCK:
+        if wiggle:
+            # Move to target position, then a small wiggle to trigger game detection
+            _set_abs(_INP_SEQ[0].union.mi, sx, sy)
+            _set_abs(_INP_SEQ[1].union.mi, sx + 2, sy + 2)
+            _set_abs(_INP_SEQ[2].union.mi, sx - 1, sy - 1)
+            _set_abs(_INP_SEQ[3].union.mi, sx, sy)
+            _SendInput(6, _INP_SEQ, _INPUT_SIZE)
+        else:
+            # Skip the wiggle: write the move straight into entry 3 and send 3..5 (move, down, up)
+            _set_abs(_INP_SEQ[3].union.mi, sx, sy)
+            _SendInput(3, byref(_INP_SEQ[3]), _INPUT_SIZE)
+
+    # Remaining clicks
     delay_s = (delay_ms / 1000.0) if delay_ms else 0.05
 
-    for i in range(clicks):
+    for _ in range(clicks - 1):
+        time.sleep(delay_s)
         click_mouse()
-        if i < clicks - 1:  # Don't delay after last click
-            time.sleep(delay_s)
+
+    # Give the game a moment to poll the input before the next action
+    time.sleep(0.05)
+
+def send_alt_enter():
+    """
+    Press Alt+Enter (toggles fullscreen/windowed in many games) as one
+    SendInput batch of four key events. Goes to the foreground window.
+    """
+    with _INPUT_LOCK:
+        _SendInput(4, _INP_ALT_ENTER, _INPUT_SIZE)
 
 def scroll_view(win_rect, pt: Point, direction: str = "down", clicks: int = 3):
     """
@@ -149,13 +256,10 @@ def scroll_view(win_rect, pt: Point, direction: str = "down", clicks: int = 3):
     if direction.lower() == "down":
         scroll_amount = -scroll_amount
 
-    # Create input structure for mouse wheel
-    inp = INPUT()
-    inp.type = 0  # INPUT_MOUSE
-    inp.union.mi = MOUSEINPUT()
-    inp.union.mi.mouseData = scroll_amount
-    inp.union.mi.dwFlags = MOUSEEVENTF_WHEEL
+    with _INPUT_LOCK:
+        # mouseData is a DWORD, so a negative delta is passed as its unsigned form
+        _INP_WHEEL.union.mi.mouseData = scroll_amount & 0xFFFFFFFF
 
-    # Send the scroll input
-    windll.user32.SendInput(1, pointer(inp), sizeof(INPUT))
+        # Send the scroll input
+        _SendInput(1, byref(_INP_WHEEL), _INPUT_SIZE)
     time.sleep(0.1)
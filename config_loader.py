@@ -4,13 +4,15 @@ config_loader.py
 Loads and validates configuration from config.yaml
 """
 
-import yaml
+import os
+import pickle
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Config:
     """Main configuration object"""
 
@@ -36,6 +38,7 @@ class Config:
     max_refresh_ms: int
     refresh_step: int
     min_sleep_s: float
+    state_refresh_ms: Dict[str, int]
 
     # OCR config
     ocr_enabled: bool
@@ -43,10 +46,12 @@ class Config:
     min_conf: int
     max_conf: int
     conf_step: int
+    ocr_tesseract_config: str
 
     # Template config
     default_template_confidence: float
     template_timeout_s: float
+    detect_scale: float
 
     # Automation config
     pyautogui_failsafe: bool
@@ -68,10 +73,22 @@ class Config:
     template_paths_map: Dict[str, List[str]]
 
 
+# Cache of already built Config objects.
+# Keyed on (path, mtime_ns, size) so editing config.yaml invalidates the entry.
+_CONFIG_CACHE: "OrderedDict[Tuple[str, int, int], Config]" = OrderedDict()
+_CONFIG_CACHE_MAX = 16
+
+# Bump this whenever the Config fields change so old .pkl sidecars are ignored.
+_SCHEMA_VERSION = 8
+
+
 def load_config(config_path: Optional[Path] = None) -> Config:
     """
     Load configuration from YAML file.
 
+    Repeated calls for an unchanged file return the cached Config instead of
+    re-parsing the YAML.
+
     Args:
         config_path: Path to config.yaml. If None, uses default location.
 
@@ -89,12 +106,120 @@ def load_config(config_path: Optional[Path] = None) -> Config:
     else:
         app_dir = config_path.parent
 
-    # Load YAML
-    if not config_path.exists():
+    try:
+        st = os.stat(config_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
-    with open(config_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    key = (str(config_path), st.st_mtime_ns, st.st_size)
+    cached = _CONFIG_CACHE.get(key)
+    if cached is not None:
+        _CONFIG_CACHE.move_to_end(key)
+        return cached
+
+    # A pickled sidecar (config.yaml.pkl) written for this exact YAML
+    # (same mtime_ns and size) skips YAML parsing entirely.
+    # Otherwise parse and refresh the sidecar.
+    pickle_path = config_path.with_suffix(config_path.suffix + ".pkl")
+    yaml_stamp = (st.st_mtime_ns, st.st_size)
+    config = _read_config_pickle(pickle_path, config_path, yaml_stamp)
+    if config is None:
+        config = _parse_config(config_path, app_dir)
+        _write_config_pickle(pickle_path, config_path, yaml_stamp, config)
+
+    # Decoded after the pickle is written and read, never stored in it:
+    # the sidecar only tracks config.yaml, so a replaced PNG must be read fresh.
+    _attach_detector_templates(config.detectors)
+
+    _CONFIG_CACHE[key] = config
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX:
+        _CONFIG_CACHE.popitem(last=False)
+
+    return config
+
+
+def _read_config_pickle(pickle_path: Path, config_path: Path, yaml_stamp: Tuple[int, int]) -> Optional[Config]:
+    """
+    Return the Config stored in the pickle sidecar, or None if it is missing,
+    was written for a different YAML (mtime_ns, size), from another schema
+    version, or unreadable.
+
+    The stamp must match exactly: a YAML replaced by one with an older or
+    preserved mtime (cp -p, unzip, restore) still counts as changed.
+    """
+    try:
+        with open(pickle_path, "rb") as f:
+            version, source, stamp, config = pickle.load(f)
+    except Exception:
+        return None
+
+    if (
+        version != _SCHEMA_VERSION
+        or source != str(config_path)
+        or tuple(stamp) != tuple(yaml_stamp)
+        or not isinstance(config, Config)
+    ):
+        return None
+    return config
+
+
+def _write_config_pickle(pickle_path: Path, config_path: Path, yaml_stamp: Tuple[int, int], config: Config) -> None:
+    """
+    Best effort: write the pickle sidecar atomically (temp file + os.replace).
+    A read-only folder just means the next start parses YAML again.
+    """
+    tmp_path = pickle_path.with_name(pickle_path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((_SCHEMA_VERSION, str(config_path), yaml_stamp, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, pickle_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _attach_detector_templates(detectors: Dict[str, Any]) -> None:
+    """
+    Decode every image detector's template files once and store the BGR arrays
+    on the detector as detector["templates"] (same order as detector["paths"]).
+
+    Detectors with an unreadable file are left without "templates";
+    validate_template_files reports those and the scan falls back to the paths.
+
+    Called by load_config on every fresh load (not cached in the pickle sidecar).
+    """
+    try:
+        import cv2
+    except ImportError:
+        return
+
+    decoded: Dict[str, Any] = {}  # path -> array, shared between detectors
+    for detector in detectors.values():
+        if detector.get("kind") != "image":
+            continue
+
+        templates = []
+        for path in detector.get("paths", []):
+            if path not in decoded:
+                decoded[path] = cv2.imread(path, cv2.IMREAD_COLOR)
+            templates.append(decoded[path])
+
+        if templates and all(t is not None for t in templates):
+            detector["templates"] = templates
+
+
+def _parse_config(config_path: Path, app_dir: Path) -> Config:
+    """Read config.yaml from disk and build a Config object."""
+    # Imported here so a fresh pickle sidecar never pays for PyYAML.
+    import yaml
+
+    # Prefer the libyaml-backed loader when PyYAML was built with it.
+    # Reading bytes lets libyaml do the UTF-8 decoding itself.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(config_path, "rb") as f:
+        data = yaml.load(f, Loader=loader)
 
     if not data:
         raise ValueError("Config file is empty")
@@ -132,10 +257,10 @@ def load_config(config_path: Optional[Path] = None) -> Config:
                 template_paths_map[key] = [str(app_dir / paths)]
 
         # Build detectors dict with resolved paths
+        # The parsed YAML is thrown away after this function, so each
+        # detector dict is edited in place instead of being copied.
         detectors = {}
-        for name, detector_cfg in data["detectors"].items():
-            detector = detector_cfg.copy()
-
+        for name, detector in data["detectors"].items():
             # If it's an image detector, resolve template paths
             if detector.get("kind") == "image":
                 template_key = detector.get("template_key")
@@ -166,15 +291,18 @@ def load_config(config_path: Optional[Path] = None) -> Config:
             max_refresh_ms=scan["max_refresh_ms"],
             refresh_step=scan["refresh_step"],
             min_sleep_s=scan["min_sleep_between_scans_s"],
+            state_refresh_ms={str(k): int(v) for k, v in (scan.get("state_refresh_ms") or {}).items()},
 
             ocr_enabled=ocr.get("enabled", True),
             default_conf_threshold=ocr["default_confidence_threshold"],
             min_conf=ocr["min_confidence"],
             max_conf=ocr["max_confidence"],
             conf_step=ocr["confidence_step"],
+            ocr_tesseract_config=ocr.get("tesseract_config") or "",
 
             default_template_confidence=templates_cfg["default_confidence"],
             template_timeout_s=templates_cfg["timeout_seconds"],
+            detect_scale=float(templates_cfg.get("detect_scale", 1.0)),
 
             pyautogui_failsafe=automation["failsafe"],
             pyautogui_pause=automation["pause_between_actions"],
@@ -211,11 +339,25 @@ def validate_template_files(config: Config) -> List[str]:
     """
     missing = []
 
+    # One directory listing per folder instead of one stat per file.
+    # Names go through normcase so the check stays case-insensitive on Windows.
+    dir_entries: Dict[str, set] = {}
+
     for detector_name, detector_cfg in config.detectors.items():
         if detector_cfg.get("kind") == "image":
             paths = detector_cfg.get("paths", [])
             for path in paths:
-                if not Path(path).exists():
+                dirname, basename = os.path.split(path)
+                entries = dir_entries.get(dirname)
+                if entries is None:
+                    try:
+                        with os.scandir(dirname or ".") as it:
+                            entries = {os.path.normcase(e.name) for e in it}
+                    except OSError:
+                        entries = set()
+                    dir_entries[dirname] = entries
+
+                if os.path.normcase(basename) not in entries:
                     missing.append(f"{detector_name}: {path}")
 
     return missing
@@ -6,7 +6,9 @@ All debug related helpers live here so main.py stays readable.
 What this module provides:
 - toggles for saving screenshots
 - save_debug_screenshot: save PIL images into a project folder subdir
+- save_debug_frame: save a raw + OCR-annotated copy of a BGR frame, all off-thread
 - draw_ocr_boxes: draw OCR bounding boxes + labels onto an image copy
+- draw_ocr_boxes_on_array: the same, drawn in place onto a NumPy RGB array
 - log_detectors: optional helper to print detector results in a consistent way
 
 This module intentionally has no Tkinter code.
@@ -15,11 +17,14 @@ It only deals with images and formatting text for logs.
 
 from __future__ import annotations
 
+import heapq
+import operator
+import queue
+import threading
+import time
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Any, Dict
-from PIL import ImageDraw
+from typing import Callable, Optional, List, Any, Dict, Set
 
 
 # =========================
@@ -50,25 +55,137 @@ def project_dir() -> Path:
     return Path(__file__).resolve().parent
 
 
+# Screenshot folders already created this session (skips a mkdir per save)
+_created_dirs: Set[Path] = set()
+
+# PNG encoding happens on a background thread so the scan loop never waits on zlib.
+# The queue holds zero-argument jobs and is bounded; when it is full the
+# oldest pending job is dropped. Drops and save failures go to _save_log
+# (print until the app hands over its log function with set_save_log).
+_SAVE_QUEUE_MAX = 8
+_save_log: Callable[[str], None] = print
+
+# zlib level for debug PNGs: 1 encodes several times faster than PIL's default (6)
+# for somewhat larger files, which is the right trade for throwaway screenshots.
+PNG_COMPRESS_LEVEL = 1
+_save_queue: "queue.Queue" = queue.Queue(maxsize=_SAVE_QUEUE_MAX)
+_save_thread: Optional[threading.Thread] = None
+_save_thread_lock = threading.Lock()
+
+
+def set_save_log(log_fn: Callable[[str], None]) -> None:
+    """Report dropped and failed screenshot saves through log_fn (must be thread-safe)."""
+    global _save_log
+    _save_log = log_fn
+
+
+def _save_worker() -> None:
+    """Background thread: run queued save jobs."""
+    while True:
+        job = _save_queue.get()
+        try:
+            job()
+        except Exception as e:
+            _save_log(f"[debug] screenshot save FAILED: {type(e).__name__}: {e}")
+        finally:
+            _save_queue.task_done()
+
+
+def _ensure_save_thread() -> None:
+    global _save_thread
+    with _save_thread_lock:
+        if _save_thread is None:
+            _save_thread = threading.Thread(target=_save_worker, name="debug-screenshot-saver", daemon=True)
+            _save_thread.start()
+
+
+def _enqueue_save(job) -> None:
+    """Queue a save job, dropping the oldest pending one if the queue is full."""
+    _ensure_save_thread()
+    while True:
+        try:
+            _save_queue.put_nowait(job)
+            return
+        except queue.Full:
+            try:
+                _save_queue.get_nowait()
+                _save_queue.task_done()
+                _save_log("[debug] screenshot queue full, dropped the oldest pending save")
+            except queue.Empty:
+                pass
+
+
+def flush_debug_screenshots() -> None:
+    """Block until every queued screenshot has been written."""
+    if _save_thread is not None:
+        _save_queue.join()
+
+
 def save_debug_screenshot(pil_img, subfolder: str = DEBUG_SCREENSHOT_DIRNAME, prefix: str = "desktop") -> str:
     """
     Save a PIL image to: <project>/<subfolder>/<prefix>_<timestamp>.png
 
+    The timestamp is time.time_ns() (nanoseconds since the epoch), which
+    sorts correctly and avoids strftime formatting on every save.
+
     Returns:
-        The full saved path as a string.
+        The full path the image will be saved to, as a string.
 
     Notes:
-        - Uses mkdir(parents=True, exist_ok=True) so the folder is auto created.
-        - Raises exception if saving fails, caller should catch and log.
+        - Uses mkdir(parents=True, exist_ok=True) the first time a folder is used.
+        - The PNG is written by a background thread; this returns immediately.
+          Save failures are reported through set_save_log's function, not raised here.
     """
-    base_dir = project_dir() / subfolder
-    base_dir.mkdir(parents=True, exist_ok=True)
+    out_path = _screenshot_path(subfolder, prefix)
+    img = pil_img.copy()
+    _enqueue_save(lambda: img.save(out_path, format="PNG", compress_level=PNG_COMPRESS_LEVEL))
+    return out_path
+
+
+def save_debug_frame(
+        frame_bgr,
+        hits=None,
+        subfolder: str = DEBUG_SCREENSHOT_DIRNAME,
+        raw_prefix: Optional[str] = "desktop",
+        annotated_prefix: Optional[str] = "annotated") -> List[str]:
+    """
+    Save a BGR frame (NumPy array) as a raw screenshot and/or a copy with
+    the OCR hits drawn on it (draw_ocr_boxes). Pass None as a prefix to skip that image.
+
+    Only an RGB copy of the frame is made here (one cvtColor pass); box
+    drawing and PNG encoding run on the background save thread, and the
+    boxes are drawn straight onto that copy instead of another one.
+
+    Returns:
+        The paths the images will be saved to (raw first), as strings.
+    """
+    import cv2
+
+    # Also the copy: the caller's buffer may be reused by the next capture
+    rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    raw_path = _screenshot_path(subfolder, raw_prefix) if raw_prefix else None
+    annotated_path = _screenshot_path(subfolder, annotated_prefix) if annotated_prefix else None
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    out_path = base_dir / f"{prefix}_{ts}.png"
+    def job():
+        from PIL import Image
 
-    pil_img.save(str(out_path), format="PNG")
-    return str(out_path)
+        if raw_path:
+            Image.fromarray(rgb).save(raw_path, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+        if annotated_path:
+            draw_ocr_boxes_on_array(rgb, hits or ())
+            Image.fromarray(rgb).save(annotated_path, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+
+    _enqueue_save(job)
+    return [p for p in (raw_path, annotated_path) if p]
+
+
+def _screenshot_path(subfolder: str, prefix: str) -> str:
+    """<project>/<subfolder>/<prefix>_<time_ns>.png, creating the folder on first use."""
+    base_dir = project_dir() / subfolder
+    if base_dir not in _created_dirs:
+        base_dir.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(base_dir)
+    return str(base_dir / f"{prefix}_{time.time_ns()}.png")
 
 
 def draw_ocr_boxes(pil_img, hits, max_boxes: Optional[int] = None):
@@ -87,29 +204,44 @@ def draw_ocr_boxes(pil_img, hits, max_boxes: Optional[int] = None):
     Notes:
         - We avoid importing your OcrHit type here to prevent circular imports.
         - We just rely on attributes at runtime.
+        - Drawing is done with OpenCV on a NumPy copy of the pixels,
+          which is much cheaper per box than PIL ImageDraw.
     """
 
-    out = pil_img.copy()
-    draw = ImageDraw.Draw(out)
+    # Imported here so importing debugging stays cheap when no boxes are drawn
+    import numpy as np
+    from PIL import Image
+
+    # np.array makes a writable copy, so the caller's image is untouched
+    arr = np.array(pil_img)
+    draw_ocr_boxes_on_array(arr, hits, max_boxes)
+    return Image.fromarray(arr)
 
-    # Sort so the best confidence boxes are drawn first
-    hits_sorted = sorted(hits, key=lambda h: h.conf, reverse=True)
-    if max_boxes is not None:
-        hits_sorted = hits_sorted[:max_boxes]
 
-    for h in hits_sorted:
+def draw_ocr_boxes_on_array(arr, hits, max_boxes: Optional[int] = None) -> None:
+    """
+    Draw OCR bounding boxes + labels in place onto an RGB uint8 NumPy array.
+    Same drawing as draw_ocr_boxes, for callers that own a throwaway buffer.
+    """
+    import cv2
+
+    # Drawing every box needs no ordering; only pick the top N when limited
+    if max_boxes is None:
+        hits_iter = hits
+    else:
+        hits_iter = heapq.nlargest(max_boxes, hits, key=operator.attrgetter("conf"))
+
+    for h in hits_iter:
         x, y, w, hh = h.bbox
         x2, y2 = x + w, y + hh
 
-        # Draw rectangle
-        draw.rectangle([x, y, x2, y2], outline="yellow", width=2)
+        # Draw rectangle (yellow in RGB)
+        cv2.rectangle(arr, (x, y), (x2, y2), (255, 255, 0), 2)
 
-        # Draw label
+        # Draw label (putText anchors at the text baseline, not the top)
         label = f"{h.text} ({h.conf})"
-        text_y = y - 14 if y - 14 > 0 else y + 2
-        draw.text((x, text_y), label, fill="yellow")
-
-    return out
+        text_y = y - 4 if y - 14 > 0 else y + 12
+        cv2.putText(arr, label, (x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1, cv2.LINE_AA)
 
 
 def log_detectors(results: Dict[str, Any], log_fn, filter_text: str = "") -> None:
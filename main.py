@@ -17,11 +17,24 @@ Notes:
 - Later you can remove or comment out the DEBUG blocks.
 """
 
+import os
+
+# One OCR runs at a time on a small image, so Tesseract's OpenMP threads only
+# add start-up cost. Set before tesseract.exe is spawned or tesserocr is loaded
+# (both read it from the environment); an explicit user setting wins.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 import time
-from datetime import datetime
+import bisect
+import re
+import functools
+import shlex
+import zlib
 import threading
 import cv2
 import queue
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
@@ -38,17 +51,14 @@ import mss
 import numpy as np
 from PIL import Image
 
-import pytesseract
-
-import pyautogui
-from pyscreeze import ImageNotFoundException
+from pyscreeze import Box
 
 from process_manager import ensure_process_running
-from window_manager import EnforceConfig, ensure_window
+from window_manager import EnforceConfig, ensure_window, window_status_still_valid
 
-from click_points import CLICK_POINTS
-from clicker import click_point, scroll_view
-from state_machine import resolve_state
+import clicker
+from clicker import click_point, click_by_name, scroll_view
+from state_machine import StateResolver
 
 import states
 
@@ -71,9 +81,118 @@ except Exception as e:
     import sys
     sys.exit(1)
 
-# Configure Tesseract from config
-if CONFIG.tesseract_exe_path:
-    pytesseract.pytesseract.tesseract_cmd = CONFIG.tesseract_exe_path
+# Tesseract is imported on first OCR use (OCR is often disabled in config)
+_pytesseract = None
+
+
+def _get_pytesseract():
+    """Import pytesseract on first use and point it at the configured exe."""
+    global _pytesseract
+    if _pytesseract is None:
+        import pytesseract
+        if CONFIG.tesseract_exe_path:
+            pytesseract.pytesseract.tesseract_cmd = CONFIG.tesseract_exe_path
+        _pytesseract = pytesseract
+    return _pytesseract
+
+
+# tesserocr, if installed, keeps the Tesseract engine loaded in this process
+# instead of starting tesseract.exe (and loading the model) on every OCR call.
+# Imported on first OCR use like pytesseract; False means "tried, not installed".
+_tesserocr = None
+_tess_local = threading.local()  # one PyTessBaseAPI per OCR thread (the API is not thread-safe)
+
+
+def _get_tesserocr():
+    """The tesserocr module, or None if it isn't installed."""
+    global _tesserocr
+    if _tesserocr is None:
+        try:
+            import tesserocr
+            _tesserocr = tesserocr
+        except ImportError:
+            _tesserocr = False
+    return _tesserocr or None
+
+
+def _tesserocr_api(tesserocr):
+    """
+    This thread's PyTessBaseAPI, created on first use with the options from
+    ocr.tesseract_config (--oem, --psm, --dpi, -l and -c name=value).
+    """
+    api = getattr(_tess_local, "api", None)
+    if api is not None:
+        return api
+
+    kwargs: Dict[str, Any] = {"lang": "eng"}
+    variables: Dict[str, str] = {}
+    args = shlex.split(CONFIG.ocr_tesseract_config or "")
+    for opt, value in zip(args, args[1:] + [""]):
+        if opt == "--oem":
+            kwargs["oem"] = int(value)
+        elif opt == "--psm":
+            kwargs["psm"] = int(value)
+        elif opt == "-l":
+            kwargs["lang"] = value
+        elif opt == "--dpi":
+            variables["user_defined_dpi"] = value
+        elif opt == "-c" and "=" in value:
+            name, _, val = value.partition("=")
+            variables[name] = val
+
+    if CONFIG.tesseract_exe_path:
+        # Windows installs keep the models next to tesseract.exe
+        kwargs["path"] = str(Path(CONFIG.tesseract_exe_path).parent / "tessdata")
+
+    api = tesserocr.PyTessBaseAPI(**kwargs)
+    for name, val in variables.items():
+        api.SetVariable(name, val)
+    _tess_local.api = api
+    return api
+
+
+def warm_up_ocr():
+    """
+    Load the OCR engine on the calling thread ahead of the first scan: the
+    thread's PyTessBaseAPI (model load) with tesserocr, else the pytesseract import.
+    Never raises; a failure here shows up again on the first real OCR call.
+    """
+    try:
+        tesserocr = _get_tesserocr()
+        if tesserocr is not None:
+            _tesserocr_api(tesserocr)
+        else:
+            _get_pytesseract()
+    except Exception:
+        pass
+
+
+def _tesserocr_image_to_data(tesserocr, gray: np.ndarray) -> Dict[str, list]:
+    """Word-level text/conf/left/top/width/height lists, like pytesseract.image_to_data."""
+    api = _tesserocr_api(tesserocr)
+    gray = np.ascontiguousarray(gray, dtype=np.uint8)
+    h, w = gray.shape
+    api.SetImageBytes(gray.tobytes(), w, h, 1, w)
+    api.Recognize()
+
+    data: Dict[str, list] = {k: [] for k in ("text", "conf", "left", "top", "width", "height")}
+    it = api.GetIterator()
+    if it is None:
+        return data
+
+    level = tesserocr.RIL.WORD
+    for word in tesserocr.iterate_level(it, level):
+        box = word.BoundingBox(level)
+        if box is None:
+            continue
+        x1, y1, x2, y2 = box
+        data["text"].append(word.GetUTF8Text(level))
+        data["conf"].append(word.Confidence(level))
+        data["left"].append(x1)
+        data["top"].append(y1)
+        data["width"].append(x2 - x1)
+        data["height"].append(y2 - y1)
+    return data
 
 # =========================
 # DATA MODELS (dataclasses)
@@ -90,6 +209,55 @@ class OcrHit:
     bbox: Tuple[int, int, int, int]
 
 
+@dataclass
+class OcrHits:
+    """
+    All OCR hits of one scan stored column-wise (one array per field) so
+    confidence sorting and filtering are NumPy operations on a single column.
+
+    - text: object array of str
+    - conf: int32 array
+    - bbox: (N, 4) int32 array of x, y, w, h
+
+    Indexing or iterating yields OcrHit objects, so code written for a list
+    of OcrHit (e.g. debugging.draw_ocr_boxes) keeps working.
+    """
+    text: np.ndarray
+    conf: np.ndarray
+    bbox: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "OcrHits":
+        return cls(
+            text=np.empty(0, dtype=object),
+            conf=np.empty(0, dtype=np.int32),
+            bbox=np.empty((0, 4), dtype=np.int32),
+        )
+
+    @classmethod
+    def from_list(cls, hits: List[OcrHit]) -> "OcrHits":
+        if not hits:
+            return cls.empty()
+        text = np.empty(len(hits), dtype=object)
+        text[:] = [h.text for h in hits]
+        return cls(
+            text=text,
+            conf=np.array([h.conf for h in hits], dtype=np.int32),
+            bbox=np.array([h.bbox for h in hits], dtype=np.int32).reshape(-1, 4),
+        )
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def __getitem__(self, i: int) -> OcrHit:
+        x, y, w, h = self.bbox[i].tolist()
+        return OcrHit(text=self.text[i], conf=int(self.conf[i]), bbox=(x, y, w, h))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
 # =========================
 # DETECTOR REGISTRY
 # Put near the top of main.py (after imports and dataclasses)
@@ -110,30 +278,100 @@ class DetectResult:
 # Detectors are now loaded from CONFIG
 # Access via: CONFIG.detectors
 
-# Configure PyAutoGUI from config
-pyautogui.FAILSAFE = CONFIG.pyautogui_failsafe
-pyautogui.PAUSE = CONFIG.pyautogui_pause
+@functools.lru_cache(maxsize=64)
+def _load_template(template_path: str) -> np.ndarray:
+    """Read and decode a template PNG once (BGR)."""
+    img = cv2.imread(template_path, cv2.IMREAD_COLOR)
+    if img is None:
+        raise FileNotFoundError(f"Template could not be read: {template_path}")
+    return img
+
+
+# Recent find_image_on_screen hits: (template_path, confidence, win_rect) -> (timestamp, box)
+# Only hits are kept, so a miss always searches (and waits out timeout_s) again.
+# Entries expire after IMAGE_HIT_TTL_S and are dropped when the window moves.
+# Kept in least-recently-used order and capped at _RECENT_HITS_MAX entries.
+_recent_hits: "OrderedDict[Tuple[str, float, Any], Tuple[float, Box]]" = OrderedDict()
+_RECENT_HITS_MAX = 64
+IMAGE_HIT_TTL_S = CONFIG.template_timeout_s / 4
 
-def find_image_on_screen(template_path: str, confidence: float = 0.85, timeout_s: float = 2.0):
+
+def invalidate_image_cache():
+    """Forget recent find_image_on_screen results (call when the window moves)."""
+    _recent_hits.clear()
+
+
+def find_image_on_screen(
+    template_path: str,
+    confidence: float = 0.85,
+    timeout_s: float = 2.0,
+    win_rect: Optional[Tuple[int, int, int, int]] = None,
+):
     """
-    Returns a pyautogui Box (left, top, width, height) or None.
-    Never raises ImageNotFoundException.
+    Returns a pyscreeze Box (left, top, width, height) or None.
+    Never raises.
+
+    Each attempt is one MSS capture plus a cv2.matchTemplate against the
+    cached template. Pass win_rect (left, top, right, bottom) to search only
+    inside the game window instead of the whole desktop.
+    A hit for the same template, confidence and win_rect within the last
+    IMAGE_HIT_TTL_S seconds is reused.
     """
-    t0 = time.time()
-    while time.time() - t0 < timeout_s:
+    if win_rect is not None:
+        wl, wt, wr, wb = win_rect
+        region = {"left": int(wl), "top": int(wt), "width": int(wr - wl), "height": int(wb - wt)}
+    else:
+        region = None
+
+    key = (template_path, confidence, tuple(win_rect) if win_rect is not None else None)
+    now = time.time()
+    recent = _recent_hits.get(key)
+    if recent is not None:
+        if now - recent[0] < IMAGE_HIT_TTL_S:
+            _recent_hits.move_to_end(key)
+            return recent[1]
+        del _recent_hits[key]
+
+    box = None
+    t0 = now
+
+    # Back off between misses (2ms growing to 25ms) instead of spinning.
+    # timeout_s <= 0 means a single "is it there now" attempt.
+    sleep_s = 0.002
+    max_sleep_s = 0.025
+    frame_bgr = None  # reused as the cvtColor destination by every retry
+    sct = templ = mon = None  # resolved once, on the first attempt that gets that far
+    while True:
         try:
-            box = pyautogui.locateOnScreen(template_path, confidence=confidence)
-        except ImageNotFoundException:
-            # PyAutoGUI/PyScreeze sometimes throws instead of returning None
-            box = None
+            if mon is None:
+                templ = _load_template(template_path)
+                sct = _thread_sct()
+                mon = region or sct.monitors[0]
+            frame_bgr = cv2.cvtColor(np.asarray(sct.grab(mon)), cv2.COLOR_BGRA2BGR, dst=frame_bgr)
+
+            score, (x, y) = match_template_once(frame_bgr, templ)
+            if score >= confidence:
+                h, w = templ.shape[:2]
+                box = Box(mon["left"] + x, mon["top"] + y, w, h)
         except Exception:
             # Any unexpected issues should not kill your scan loop
             box = None
 
         if box:
-            return box
+            break
 
-    return None
+        remaining = timeout_s - (time.time() - t0)
+        if remaining <= 0:
+            break
+        time.sleep(min(sleep_s, remaining))
+        sleep_s = min(sleep_s * 1.5, max_sleep_s)
+
+    if box:
+        _recent_hits[key] = (time.time(), box)
+        _recent_hits.move_to_end(key)
+        if len(_recent_hits) > _RECENT_HITS_MAX:
+            _recent_hits.popitem(last=False)
+    return box
 
 
 
@@ -141,26 +379,168 @@ def find_image_on_screen(template_path: str, confidence: float = 0.85, timeout_s
 # DETECTOR ENGINE HELPERS
 # These functions assume you already have:
 # - hits: List[OcrHit] from your OCR scan
-# - find_image_on_screen(...) using pyautogui.locateOnScreen
+# - find_image_on_screen(...) using MSS + cv2.matchTemplate
 # =========================
 
-def _first_ocr_hit_containing(hits: List["OcrHit"], token: str, min_conf: int) -> Optional["OcrHit"]:
+# OCR detectors without a "roi" are searched within this many pixels of where
+# they were last found (see ocr_roi_rects); a miss goes back to the whole frame.
+OCR_ANCHOR_MARGIN_PX = 40
+
+# Separate OCR regions are stacked into one image for a single Tesseract call
+# when their pixels add up to at most this fraction of the rect spanning them
+# all (see ocr_regions_to_hits); otherwise that spanning rect is read as is.
+OCR_STACK_MAX_AREA_RATIO = 0.5
+OCR_STACK_GAP_PX = 16  # blank rows between stacked regions
+
+# Most recent OCR results kept by ocr_regions_to_hits(cache=...), keyed on the
+# regions and a CRC of their pixels
+OCR_CACHE_MAX = 32
+
+
+# Optional: pyahocorasick finds every OCR detector token in one pass over the
+# scan's OCR text. Without it one compiled regex alternation does the same pass.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+@functools.lru_cache(maxsize=8)
+def _token_automaton(tokens_l: Tuple[str, ...]):
+    """Aho-Corasick automaton over lowercased tokens (built once per token set)."""
+    automaton = ahocorasick.Automaton()
+    for token_l in tokens_l:
+        automaton.add_word(token_l, token_l)
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=8)
+def _token_regex(tokens_l: Tuple[str, ...]):
+    """
+    (pattern, prefixes) for finding tokens_l with re when pyahocorasick is missing.
+    The pattern is a zero-width lookahead, so it reports a match at every start
+    position, longest token first. prefixes maps each token to the tokens that
+    start it (itself included), which match at the same position.
+    """
+    by_len = sorted(tokens_l, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, by_len)) + "))")
+    prefixes = {t: tuple(p for p in tokens_l if t.startswith(p)) for t in tokens_l}
+    return pattern, prefixes
+
+
+class OcrHitIndex:
+    """
+    OCR hits prepared once per scan for repeated token lookups:
+    - sorted by confidence (best first)
+    - lowercased text computed once
+    - optional first position containing each of tokens_l, found in one pass
+      (Aho-Corasick with pyahocorasick, else a compiled regex)
+    """
+    def __init__(
+        self,
+        hits: "OcrHits | List[OcrHit]",
+        tokens_l: Optional[Tuple[str, ...]] = None,
+    ):
+        if not isinstance(hits, OcrHits):
+            hits = OcrHits.from_list(hits)
+        self.hits = hits
+        # Positions into hits, best confidence first (stable for ties)
+        self.order = np.argsort(-hits.conf, kind="stable")
+        self.conf = hits.conf[self.order]
+        self.texts_l = [t.lower() for t in hits.text[self.order].tolist()]
+
+        # token_l -> first position whose text contains it, or -1
+        self.first_pos: Dict[str, int] = {}
+        if tokens_l:
+            self.first_pos = self._first_positions(tokens_l)
+
+    def _first_positions(self, tokens_l: Tuple[str, ...]) -> Dict[str, int]:
+        # Texts joined with a separator no token contains, so a match never spans
+        # two hits. Matches come in order of where they end, so the first one per
+        # token is in the earliest (best confidence) hit.
+        first = dict.fromkeys(tokens_l, -1)
+        starts = []
+        pos = 0
+        for txt in self.texts_l:
+            starts.append(pos)
+            pos += len(txt) + 1
+
+        joined = "\x00".join(self.texts_l)
+        remaining = len(first)
+        if ahocorasick is not None:
+            for end, token_l in _token_automaton(tokens_l).iter(joined):
+                if first[token_l] < 0:
+                    first[token_l] = bisect.bisect_right(starts, end) - 1
+                    remaining -= 1
+                    if not remaining:
+                        break
+            return first
+
+        # Regex matches come in order of where they start, which also gives the
+        # earliest hit first.
+        pattern, prefixes = _token_regex(tokens_l)
+        for m in pattern.finditer(joined):
+            for token_l in prefixes[m.group(1)]:
+                if first[token_l] < 0:
+                    first[token_l] = bisect.bisect_right(starts, m.start()) - 1
+                    remaining -= 1
+            if not remaining:
+                break
+        return first
+
+
+def _first_ocr_hit_containing(hits: "OcrHits | List[OcrHit] | OcrHitIndex", token: str, min_conf: int) -> Optional["OcrHit"]:
     token_l = token.lower()
-    # Sort by confidence so the best match wins
-    for h in sorted(hits, key=lambda x: x.conf, reverse=True):
-        if h.conf < min_conf:
-            continue
-        if token_l in h.text.lower():
-            return h
+    if not isinstance(hits, OcrHitIndex):
+        return _best_ocr_hit_linear(hits, token_l, min_conf)
+
+    index = hits
+    first = index.first_pos.get(token_l)
+    if first is not None:
+        # The best-confidence hit containing the token; if even that one is
+        # under min_conf, every other one is too.
+        if first < 0 or index.conf[first] < min_conf:
+            return None
+        return index.hits[int(index.order[first])]
+
+    # Positions are sorted by confidence (descending), so the hits that
+    # pass min_conf are exactly the first n_ok of them.
+    n_ok = int(np.count_nonzero(index.conf >= min_conf))
+    texts_l = index.texts_l
+    for i in range(n_ok):
+        if token_l in texts_l[i]:
+            return index.hits[int(index.order[i])]
     return None
 
 
+def _best_ocr_hit_linear(hits: "OcrHits | List[OcrHit]", token_l: str, min_conf: int) -> Optional["OcrHit"]:
+    """
+    One pass, no sort: highest-confidence hit with conf >= min_conf whose text
+    contains token_l (earliest hit wins ties, same as the sorted lookup).
+    Cheaper than building an OcrHitIndex when only one token is looked up.
+    """
+    if not isinstance(hits, OcrHits):
+        hits = OcrHits.from_list(hits)
+
+    best = -1
+    best_conf = min_conf - 1
+    texts = hits.text
+    for i, c in enumerate(hits.conf.tolist()):
+        if c > best_conf and token_l in texts[i].lower():
+            best, best_conf = i, c
+            if c >= 100:
+                break
+    return hits[best] if best >= 0 else None
+
+
 def run_detector(
     name: str,
     cfg: Dict[str, Any],
-    hits: List["OcrHit"],
+    hits: "OcrHits | OcrHitIndex",
     frame_bgr: np.ndarray,
     bank: "TemplateBank",
+    prepared: "Optional[PreparedFrame]" = None,
 ) -> DetectResult:
     kind = cfg["kind"]
 
@@ -194,6 +574,9 @@ def run_detector(
                 template_paths=paths,
                 bank=bank,
                 threshold=threshold,
+                templates=cfg.get("templates"),
+                color=bool(cfg.get("color", False)),
+                prepared=prepared,
             )
         except Exception as e:
             return DetectResult(
@@ -217,29 +600,267 @@ def run_detector(
     raise ValueError(f"Unknown detector kind: {kind}")
 
 
-def run_detectors(
-    detector_names: List[str],
-    hits: List["OcrHit"],
+# Worker threads for image detectors, shared by every scan.
+_DETECTOR_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="detector")
+
+
+def run_image_detectors(
+    image_names: "List[str] | Tuple[str, ...]",
     frame_bgr: np.ndarray,
     bank: "TemplateBank",
     detectors_dict: Dict[str, Dict[str, Any]],
+    frame_gray: Optional[np.ndarray] = None,
+    roi_cache: Optional[Dict[str, Tuple[Any, DetectResult]]] = None,
 ) -> Dict[str, DetectResult]:
+    """
+    Run the named image detectors against one frame (they don't need OCR hits,
+    so this can run while Tesseract is still busy).
+    frame_gray, if the caller already has it, is reused for template matching;
+    otherwise the grayscale frame is computed once here for all detectors.
+
+    A detector with a "roi" (x, y, w, h as fractions of the window) only
+    searches that part of the frame. With roi_cache (a dict the caller keeps
+    between scans) its result is reused while the ROI's pixels are unchanged
+    (CRC32 of the ROI), so static screens skip matchTemplate for it.
+    """
+    if not image_names:
+        return {}
+
+    # A scaled bank holds scaled templates: scale the frame once to match,
+    # and scale the found boxes back to frame coordinates at the end.
+    # For 1/2, 1/3, ... the frame is just a strided view (every step-th pixel),
+    # which skips the resize pass; other scales go through cv2.resize.
+    scale = bank.scale
+    if scale != 1.0:
+        step = int(round(1.0 / scale))
+        if step > 1 and abs(step * scale - 1.0) < 1e-6:
+            frame_bgr = frame_bgr[::step, ::step]
+            if frame_gray is not None:
+                frame_gray = frame_gray[::step, ::step]
+        else:
+            frame_bgr = cv2.resize(frame_bgr, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if frame_gray is not None:
+                frame_gray = cv2.resize(frame_gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    # One grayscale frame (plus its pyramid, FFT and integrals) for every image detector
+    prepared = prepare_frame(frame_bgr, bank, frame_gray)
+    H, W = prepared.shape
+
+    # name -> (frame to search, its PreparedFrame, (x, y) offset of that frame, roi_cache key)
     out: Dict[str, DetectResult] = {}
-    for name in detector_names:
-        cfg = detectors_dict[name]
-        out[name] = run_detector(name, cfg, hits, frame_bgr, bank)
-    return out
+    jobs: Dict[str, Tuple[np.ndarray, PreparedFrame, Tuple[int, int], Any]] = {}
+    for name in image_names:
+        rect = roi_to_pixels(detectors_dict[name].get("roi"), W, H)
+        if rect is None:
+            jobs[name] = (frame_bgr, prepared, (0, 0), None)
+            continue
+
+        x0, y0, x1, y1 = rect
+        crop = frame_bgr[y0:y1, x0:x1]
+        key = None
+        if roi_cache is not None:
+            key = (zlib.crc32(np.ascontiguousarray(crop)), rect)
+            cached = roi_cache.get(name)
+            if cached is not None and cached[0] == key:
+                out[name] = cached[1]
+                continue
+        jobs[name] = (crop, PreparedFrame(crop, gray=prepared.gray[y0:y1, x0:x1]), (x0, y0), key)
+
+    # Several detectors go to the pool (cv2.matchTemplate releases the GIL)
+    if len(jobs) == 1:
+        name, (frame, prep, _, _) = next(iter(jobs.items()))
+        fresh = {name: run_detector(name, detectors_dict[name], None, frame, bank, prep)}
+    else:
+        futures = {
+            name: _DETECTOR_POOL.submit(run_detector, name, detectors_dict[name], None, frame, bank, prep)
+            for name, (frame, prep, _, _) in jobs.items()
+        }
+        fresh = {name: fut.result() for name, fut in futures.items()}
+
+    for name, res in fresh.items():
+        _, _, (ox, oy), key = jobs[name]
+        if res.bbox:
+            x, y, w, h = res.bbox
+            res.bbox = (x + ox, y + oy, w, h)
+            if scale != 1.0:
+                res.bbox = tuple(int(round(v / scale)) for v in res.bbox)
+        if key is not None:
+            roi_cache[name] = (key, res)
+        out[name] = res
+
+    # Registry order, whichever came from the cache
+    return {name: out[name] for name in image_names}
+
+
+def run_ocr_detectors(
+    ocr_names: "List[str] | Tuple[str, ...]",
+    hits: "OcrHits",
+    detectors_dict: Dict[str, Dict[str, Any]],
+) -> Dict[str, DetectResult]:
+    """Run the named OCR detectors against this scan's OCR hits."""
+    # Sort and lowercase the OCR hits once when several OCR detectors share them;
+    # a single lookup is a plain linear scan (see _best_ocr_hit_linear)
+    if len(ocr_names) > 1:
+        tokens_l = tuple(sorted({
+            t for t in (str(detectors_dict[n]["token"]).lower() for n in ocr_names) if t
+        }))
+        hits = OcrHitIndex(hits, tokens_l=tokens_l)
+
+    return {name: run_detector(name, detectors_dict[name], hits, None, None) for name in ocr_names}
+
+
+def split_detector_names(
+    detector_names: "List[str] | Tuple[str, ...]",
+    detectors_dict: Dict[str, Dict[str, Any]],
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """(image detector names, all other detector names), each in registry order."""
+    image_names = tuple(n for n in detector_names if detectors_dict[n]["kind"] == "image")
+    other_names = tuple(n for n in detector_names if detectors_dict[n]["kind"] != "image")
+    return image_names, other_names
+
+
+def ocr_roi_rects(
+    ocr_names: "List[str] | Tuple[str, ...]",
+    detectors_dict: Dict[str, Dict[str, Any]],
+    frame_w: int,
+    frame_h: int,
+    anchors: Optional[Dict[str, Tuple[int, int, int, int]]] = None,
+) -> Optional[List[Tuple[int, int, int, int]]]:
+    """
+    Pixel rects (x0, y0, x1, y1) covering the "roi" of every named OCR detector,
+    clamped to the frame, with overlapping rects merged. Each roi is (x, y, w, h)
+    as fractions of the window.
+
+    A detector without a roi uses its anchor instead: the bbox (x, y, w, h)
+    where it was last found, grown by OCR_ANCHOR_MARGIN_PX on every side.
+
+    Returns None (OCR the whole frame) when there are no OCR detectors
+    or any of them has neither a roi nor an anchor.
+    """
+    if not ocr_names:
+        return None
+
+    rects = []
+    for name in ocr_names:
+        rect = roi_to_pixels(detectors_dict[name].get("roi"), frame_w, frame_h)
+        if rect is None:
+            anchor = anchors.get(name) if anchors else None
+            if anchor is None:
+                return None
+            ax, ay, aw, ah = anchor
+            m = OCR_ANCHOR_MARGIN_PX
+            rect = (max(ax - m, 0), max(ay - m, 0), min(ax + aw + m, frame_w), min(ay + ah + m, frame_h))
+            if rect[2] <= rect[0] or rect[3] <= rect[1]:
+                return None
+        rects.append(rect)
+
+    # Merge until no two rects overlap (a merge can create a new overlap)
+    merged = True
+    while merged and len(rects) > 1:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    rects[i] = _union_rect((a, b))
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return rects
+
+
+def _union_rect(rects) -> Tuple[int, int, int, int]:
+    """Smallest (x0, y0, x1, y1) rect containing all of rects."""
+    return (
+        min(r[0] for r in rects),
+        min(r[1] for r in rects),
+        max(r[2] for r in rects),
+        max(r[3] for r in rects),
+    )
+
+
+def roi_to_pixels(roi, frame_w: int, frame_h: int) -> Optional[Tuple[int, int, int, int]]:
+    """
+    A detector "roi" (x, y, w, h as fractions of the window) as a pixel rect
+    (x0, y0, x1, y1) clamped to the frame. None if roi is missing or empty.
+    """
+    if not roi:
+        return None
+    rx, ry, rw, rh = (float(v) for v in roi)
+    x0 = max(int(rx * frame_w), 0)
+    y0 = max(int(ry * frame_h), 0)
+    x1 = min(int(np.ceil((rx + rw) * frame_w)), frame_w)
+    y1 = min(int(np.ceil((ry + rh) * frame_h)), frame_h)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1, y1
+
+
+def run_detectors(
+    detector_names: "List[str] | Tuple[str, ...]",
+    hits: "OcrHits",
+    frame_bgr: np.ndarray,
+    bank: "TemplateBank",
+    detectors_dict: Dict[str, Dict[str, Any]],
+    frame_gray: Optional[np.ndarray] = None,
+) -> Dict[str, DetectResult]:
+    """
+    Run the named detectors against one frame: run_image_detectors for the
+    image ones, run_ocr_detectors for the rest. Results keep detector_names order.
+
+    Kept as the one-call API for scripts; _scan_once calls the two halves
+    itself so OCR and template matching can overlap.
+    """
+    image_names, ocr_names = split_detector_names(detector_names, detectors_dict)
+    out = run_image_detectors(image_names, frame_bgr, bank, detectors_dict, frame_gray)
+    out.update(run_ocr_detectors(ocr_names, hits, detectors_dict))
+
+    # Same order as detector_names
+    return {name: out[name] for name in detector_names}
 
     
 # =========================
 # FAST TEMPLATE MATCHING MODULES
 # =========================
+@dataclass(frozen=True)
+class TemplateStats:
+    """
+    Per-template numbers the matchers need on every frame, computed once
+    from the grayscale template when it enters the bank.
+    """
+    h: int
+    w: int
+    sum: float       # sum of gray pixels
+    sqsum: float     # sum of squared gray pixels
+    mean: float
+    znorm: float     # ||gray - mean||, the template half of the NCC denominator
+
+
 class TemplateBank:
     """
     Loads template images once and keeps them in memory as cv2 BGR arrays.
+
+    Also caches what the matchers need per template:
+    - grayscale pixels
+    - a grayscale pyramid (cv2.pyrDown levels) for coarse-to-fine search
+    - the conjugate FFT of the zero-mean template, per FFT size
     """
-    def __init__(self):
+    def __init__(self, scale: float = 1.0):
+        # scale != 1.0 stores every template resized by that factor, for
+        # matching against frames downscaled by the same factor (see run_image_detectors)
+        self.scale = scale
         self._cache = {}  # path -> cv2 image (BGR)
+        self._gray = {}   # path -> grayscale image
+        self._levels = {}  # path -> [gray level 0, level 1, ...]
+        self._fft = {}    # (path, fft_shape) -> (conj rfft2 of zero-mean gray template, template norm)
+        self._stats = {}  # path -> TemplateStats
+        self._hit_rate = {}  # path -> EWMA of "this template matched" (0..1)
+        self._gpu = {}    # (path, color) -> template uploaded as cv2.cuda_GpuMat
+        # Scratch arrays reused between frames; per thread because
+        # run_image_detectors matches several detectors at once.
+        self._local = threading.local()
 
     def get(self, path: str):
         if path in self._cache:
@@ -248,21 +869,525 @@ class TemplateBank:
         img = cv2.imread(path, cv2.IMREAD_COLOR)  # BGR
         if img is None:
             raise FileNotFoundError(f"Template could not be read: {path}")
+        img = self._scaled(img)
         self._cache[path] = img
         return img
 
+    def add(self, path: str, img: np.ndarray):
+        """Register an already decoded BGR template (e.g. preloaded by config_loader)."""
+        if path not in self._cache:
+            self._cache[path] = self._scaled(img)
+
+    def _scaled(self, img: np.ndarray) -> np.ndarray:
+        if self.scale != 1.0:
+            img = cv2.resize(img, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return np.ascontiguousarray(img, dtype=np.uint8)
+
+    def get_gray(self, path: str) -> np.ndarray:
+        gray = self._gray.get(path)
+        if gray is None:
+            gray = cv2.cvtColor(self.get(path), cv2.COLOR_BGR2GRAY)
+            self._gray[path] = gray
+        return gray
+
+    def get_levels(self, path: str) -> List[np.ndarray]:
+        """
+        Grayscale pyramid of the template: level 0 is full size, each next
+        level is cv2.pyrDown of the previous one. Levels stop before the
+        template's short side drops under PYRAMID_MIN_TEMPLATE_SIDE
+        (too few pixels to match reliably) or after PYRAMID_MAX_LEVELS.
+        """
+        levels = self._levels.get(path)
+        if levels is None:
+            levels = [self.get_gray(path)]
+            while len(levels) <= PYRAMID_MAX_LEVELS:
+                h, w = levels[-1].shape[:2]
+                if min(h, w) // 2 < PYRAMID_MIN_TEMPLATE_SIDE:
+                    break
+                levels.append(cv2.pyrDown(levels[-1]))
+            self._levels[path] = levels
+        return levels
+
+    def get_stats(self, path: str) -> TemplateStats:
+        stats = self._stats.get(path)
+        if stats is None:
+            gray = self.get_gray(path)
+            h, w = gray.shape[:2]
+            g = gray.astype(np.float64)
+            total = float(g.sum())
+            sqsum = float((g * g).sum())
+            mean = total / (h * w)
+            znorm = float(np.sqrt(max(sqsum - h * w * mean * mean, 0.0)))
+            stats = TemplateStats(h=h, w=w, sum=total, sqsum=sqsum, mean=mean, znorm=znorm)
+            self._stats[path] = stats
+        return stats
+
+    def get_fft(self, path: str, fft_shape: Tuple[int, int]) -> Tuple[np.ndarray, float]:
+        """
+        Returns (conj(rfft2(templ - mean)), ||templ - mean||) for the grayscale
+        template zero-padded to fft_shape. Cached per (path, fft_shape).
+        """
+        key = (path, fft_shape)
+        entry = self._fft.get(key)
+        if entry is None:
+            stats = self.get_stats(path)
+            t = self.get_gray(path).astype(np.float64)
+            t -= stats.mean
+            entry = (np.conj(np.fft.rfft2(t, s=fft_shape)), stats.znorm)
+            self._fft[key] = entry
+        return entry
+
+    def get_gpu(self, path: str, color: bool = False):
+        """Grayscale (or BGR if color) template as a cv2.cuda_GpuMat, uploaded once (CUDA builds only)."""
+        key = (path, color)
+        gpu = self._gpu.get(key)
+        if gpu is None:
+            gpu = cv2.cuda_GpuMat()
+            gpu.upload(self.get(path) if color else self.get_gray(path))
+            self._gpu[key] = gpu
+        return gpu
+
+    def gpu_buffer(self, name: str):
+        """
+        Reusable cv2.cuda_GpuMat to upload frames into, one per name and calling
+        thread. Uploading a same-sized frame into it reuses the device memory.
+        """
+        gpus = getattr(self._local, "gpus", None)
+        if gpus is None:
+            gpus = self._local.gpus = {}
+        gpu = gpus.get(name)
+        if gpu is None:
+            gpu = gpus[name] = cv2.cuda_GpuMat()
+        return gpu
+
+    def buffer(self, name: str, shape: Tuple[int, ...], dtype=np.float32) -> np.ndarray:
+        """
+        Reusable output array for OpenCV dst/result parameters, one per
+        (name, shape, dtype) and calling thread. Contents are overwritten by the next user.
+        """
+        bufs = getattr(self._local, "bufs", None)
+        if bufs is None:
+            bufs = self._local.bufs = {}
+        key = (name, shape, dtype)
+        buf = bufs.get(key)
+        if buf is None:
+            buf = np.empty(shape, dtype=dtype)
+            bufs[key] = buf
+        return buf
+
+    def warm_up(self, detectors: Dict[str, Dict[str, Any]]):
+        """
+        Build everything the matchers cache per template (grayscale, pyramid,
+        stats) for every image detector, and run one small FFT match so a
+        Numba kernel is compiled before the first scan instead of during it.
+        """
+        paths = []
+        for cfg in detectors.values():
+            if cfg.get("kind") != "image":
+                continue
+            det_paths = cfg.get("paths") or [cfg["path"]]
+            templates = cfg.get("templates")
+            if templates is not None:
+                for path, templ in zip(det_paths, templates):
+                    self.add(path, templ)
+            paths.extend(det_paths)
+
+        max_h = max_w = 0
+        for path in dict.fromkeys(paths):
+            try:
+                self.get_levels(path)
+                stats = self.get_stats(path)
+            except FileNotFoundError:
+                continue
+            max_h, max_w = max(max_h, stats.h), max(max_w, stats.w)
+            last = path
+
+        if max_h:
+            frame = PreparedFrame(np.zeros((max_h + 8, max_w + 8, 3), dtype=np.uint8))
+            match_template_fft(frame, self, last)
+
+    def record_result(self, path: str, hit: bool, alpha: float = 0.2):
+        """Update the template's running hit rate (exponentially weighted)."""
+        prev = self._hit_rate.get(path, 0.0)
+        self._hit_rate[path] = prev + alpha * ((1.0 if hit else 0.0) - prev)
+
+    def order_by_hit_rate(self, paths: List[str]) -> List[str]:
+        """Paths with the most frequently matching templates first (stable for ties)."""
+        if len(paths) < 2:
+            return paths
+        return sorted(paths, key=lambda p: self._hit_rate.get(p, 0.0), reverse=True)
+
     def clear(self):
+        self._hit_rate.clear()
         self._cache.clear()
+        self._gray.clear()
+        self._stats.clear()
+        self._levels.clear()
+        self._fft.clear()
+        self._gpu.clear()
+        self._local = threading.local()
+
+
+# Coarse-to-fine search settings
+PYRAMID_MAX_LEVELS = 3          # at most 1/8 scale
+PYRAMID_MIN_TEMPLATE_SIDE = 24  # smallest template side (px) worth matching at a coarse level
+PYRAMID_SLACK = 0.25            # give up when the coarse score is below threshold - slack
+
+
+def _cuda_device_count() -> int:
+    """Number of CUDA devices OpenCV can use (0 for the usual pip builds without CUDA)."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount()
+    except (AttributeError, cv2.error):
+        return 0
+
+
+# Template matching runs on the GPU when OpenCV was built with CUDA and a device
+# is present. Set back to False if a CUDA call fails, so the scan keeps going on the CPU.
+USE_CUDA = _cuda_device_count() > 0
+_cuda_local = threading.local()  # TemplateMatching objects (gray, BGR) per detector thread
+
+
+def _dense_bgr(frame_bgr: np.ndarray) -> np.ndarray:
+    """
+    OpenCV's SIMD kernels want one dense uint8 block; strided views (e.g. the
+    [:, :, :3] slice of a BGRA capture) would otherwise be copied on every call.
+    """
+    if frame_bgr.dtype != np.uint8 or not frame_bgr.flags["C_CONTIGUOUS"]:
+        frame_bgr = np.ascontiguousarray(frame_bgr, dtype=np.uint8)
+    return frame_bgr
+
+
+class PreparedFrame:
+    """
+    One captured frame plus everything template searches against it can share:
+    grayscale pixels, their FFT and the integral images used to normalize.
+
+    The FFT and integrals are computed on first use, then reused for every template.
+    run_image_detectors shares one PreparedFrame between detector threads, so the
+    lazy parts are built under a lock.
+    """
+    def __init__(
+        self,
+        frame_bgr: np.ndarray,
+        gray_dst: Optional[np.ndarray] = None,
+        gray: Optional[np.ndarray] = None,
+        gpu_dst=None,
+        gpu_bgr_dst=None,
+    ):
+        # gray: the frame's grayscale if the caller already has it (e.g. from OCR)
+        # gray_dst: optional (H, W) uint8 array to write the grayscale frame into
+        # gpu_dst / gpu_bgr_dst: optional cv2.cuda_GpuMat to upload gray / BGR into
+        self.bgr = frame_bgr
+        if gray is None:
+            gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY, dst=gray_dst)
+        self.gray = gray
+        self.shape: Tuple[int, int] = self.gray.shape[:2]
+
+        # FFT size padded up to sizes the FFT handles quickly.
+        # Padding only adds zeros past the bottom/right edge, so valid match
+        # positions never wrap around.
+        h, w = self.shape
+        self.fft_shape = (cv2.getOptimalDFTSize(h), cv2.getOptimalDFTSize(w))
+
+        self._lock = threading.RLock()
+        self._fft: Optional[np.ndarray] = None
+        self._integrals: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._levels: List[np.ndarray] = [self.gray]
+        self._gpu = None
+        self._gpu_bgr = None
+        self._gpu_dst = gpu_dst
+        self._gpu_bgr_dst = gpu_bgr_dst
+        self._stream = None
+        self._dense_bgr: Optional[np.ndarray] = None
+
+    def dense_bgr(self) -> np.ndarray:
+        """The BGR frame as one contiguous uint8 block (copied once if it was a strided view)."""
+        if self._dense_bgr is None:
+            with self._lock:
+                if self._dense_bgr is None:
+                    self._dense_bgr = _dense_bgr(self.bgr)
+        return self._dense_bgr
+
+    def level(self, k: int) -> np.ndarray:
+        """Grayscale frame at pyramid level k (built with cv2.pyrDown on first use)."""
+        if k < len(self._levels):
+            return self._levels[k]
+        with self._lock:
+            while len(self._levels) <= k:
+                self._levels.append(cv2.pyrDown(self._levels[-1]))
+            return self._levels[k]
+
+    @property
+    def fft(self) -> np.ndarray:
+        if self._fft is None:
+            with self._lock:
+                if self._fft is None:
+                    self._fft = np.fft.rfft2(self.gray, s=self.fft_shape)
+        return self._fft
+
+    @property
+    def integrals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(sum, squared sum) integral images, each (H+1, W+1) float64."""
+        if self._integrals is None:
+            with self._lock:
+                if self._integrals is None:
+                    s1, s2 = cv2.integral2(self.gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+                    self._integrals = (s1, s2)
+        return self._integrals
+
+    @property
+    def stream(self):
+        """cv2.cuda_Stream that the frame upload and its matches are queued on."""
+        if self._stream is None:
+            with self._lock:
+                if self._stream is None:
+                    self._stream = cv2.cuda_Stream()
+        return self._stream
+
+    @property
+    def gpu(self):
+        """Grayscale frame as a cv2.cuda_GpuMat (uploaded asynchronously on first use)."""
+        if self._gpu is None:
+            with self._lock:
+                if self._gpu is None:
+                    gpu = self._gpu_dst if self._gpu_dst is not None else cv2.cuda_GpuMat()
+                    gpu.upload(self.gray, self.stream)
+                    self._gpu = gpu
+        return self._gpu
+
+    @property
+    def gpu_bgr(self):
+        """BGR frame as a cv2.cuda_GpuMat, for color detectors (uploaded on first use)."""
+        if self._gpu_bgr is None:
+            with self._lock:
+                if self._gpu_bgr is None:
+                    gpu = self._gpu_bgr_dst if self._gpu_bgr_dst is not None else cv2.cuda_GpuMat()
+                    gpu.upload(self.dense_bgr(), self.stream)
+                    self._gpu_bgr = gpu
+        return self._gpu_bgr
+
+
+def _result_peak(result: np.ndarray) -> tuple[float, tuple[int, int]]:
+    """
+    (max_value, (x, y)) of a matchTemplate result map.
+    A single argmax pass; cv2.minMaxLoc also tracks the minimum we never use.
+    """
+    idx = int(np.argmax(result))
+    y, x = divmod(idx, result.shape[1])
+    return float(result.flat[idx]), (x, y)
 
 
-def match_template_once(frame_bgr: np.ndarray, templ_bgr: np.ndarray) -> tuple[float, tuple[int, int]]:
+def match_template_once(
+    frame_bgr: np.ndarray,
+    templ_bgr: np.ndarray,
+    result: Optional[np.ndarray] = None,
+) -> tuple[float, tuple[int, int]]:
     """
     Returns: (max_score, (x, y)) where (x, y) is top-left in frame coords.
     Uses normalized correlation coefficient.
+
+    result: optional float32 (H-h+1, W-w+1) array to write the score map into.
+    """
+    result = cv2.matchTemplate(frame_bgr, templ_bgr, cv2.TM_CCOEFF_NORMED, result=result)
+    return _result_peak(result)
+
+
+# Optional: Numba fuses the FFT matcher's normalization + argmax into one pass
+# over the correlation map. Without it the NumPy expression below is used.
+# The kernel is serial on purpose: _DETECTOR_POOL already runs templates in
+# parallel, and Numba's fallback workqueue threading layer aborts the process
+# when parallel=True kernels are entered from several threads at once.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _ncc_peak(corr, s1, s2, t_norm, w, h):
+        """Normalize corr with the integral images and return (best, x, y) without building the score map."""
+        out_h, out_w = corr.shape
+        n = h * w
+        best = -np.inf
+        bx = 0
+        by = 0
+        for y in range(out_h):
+            for x in range(out_w):
+                ws = s1[y + h, x + w] - s1[y, x + w] - s1[y + h, x] + s1[y, x]
+                wq = s2[y + h, x + w] - s2[y, x + w] - s2[y + h, x] + s2[y, x]
+                var = wq - ws * ws / n
+                denom = np.sqrt(var) * t_norm if var > 0.0 else 0.0
+                v = corr[y, x] / denom if denom > 1e-6 else 0.0
+                if v > best:
+                    best = v
+                    bx = x
+                    by = y
+        return best, bx, by
+else:
+    _ncc_peak = None
+
+
+def match_template_fft(frame: PreparedFrame, bank: TemplateBank, path: str) -> tuple[float, tuple[int, int]]:
+    """
+    Same result as match_template_once (TM_CCOEFF_NORMED on grayscale), computed
+    with FFT cross-correlation so the frame transform is shared by all templates.
+
+    For window position (x, y) of a w x h template t with zero-mean t':
+        score = sum(f * t') / (sqrt(sum(f^2) - sum(f)^2 / (w*h)) * ||t'||)
+    The numerator comes from one inverse FFT, the window sums from the
+    frame's integral images.
+
+    Returns: (max_score, (x, y)); score is -1.0 if the template is larger than the frame.
+    """
+    H, W = frame.shape
+    stats = bank.get_stats(path)
+    h, w = stats.h, stats.w
+    if h > H or w > W:
+        return -1.0, (0, 0)
+
+    t_fft_conj, t_norm = bank.get_fft(path, frame.fft_shape)
+    if t_norm == 0.0:
+        # Flat template: correlation is undefined everywhere
+        return 0.0, (0, 0)
+
+    out_h, out_w = H - h + 1, W - w + 1
+    corr = np.fft.irfft2(frame.fft * t_fft_conj, s=frame.fft_shape)[:out_h, :out_w]
+
+    s1, s2 = frame.integrals
+    if _ncc_peak is not None:
+        score, x, y = _ncc_peak(corr, s1, s2, t_norm, w, h)
+        return float(score), (int(x), int(y))
+
+    win_sum = s1[h:, w:] - s1[:-h, w:] - s1[h:, :-w] + s1[:-h, :-w]
+    win_sq = s2[h:, w:] - s2[:-h, w:] - s2[h:, :-w] + s2[:-h, :-w]
+    win_var = np.maximum(win_sq - win_sum * win_sum / (h * w), 0.0)
+
+    denom = np.sqrt(win_var) * t_norm
+    # Flat frame windows (denom ~ 0) score 0 instead of dividing by zero
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(denom > 1e-6, corr / denom, 0.0)
+
+    idx = int(np.argmax(score))
+    y, x = np.unravel_index(idx, score.shape)
+    return float(score.flat[idx]), (int(x), int(y))
+
+
+def match_template_pyramid(
+    frame: PreparedFrame,
+    bank: TemplateBank,
+    path: str,
+    threshold: float,
+) -> tuple[float, tuple[int, int]]:
+    """
+    Coarse-to-fine NCC search.
+
+    - Match the coarsest template level against the whole frame at that level.
+    - If that score is below threshold - PYRAMID_SLACK, stop: it is a miss.
+    - Otherwise refine level by level, searching only a small window around
+      the previous peak (scaled x2), down to full resolution.
+
+    Templates too small to shrink fall back to the full-resolution FFT search.
+
+    Returns: (score, (x, y)) in full-resolution frame coords.
+    """
+    t_levels = bank.get_levels(path)
+    top = len(t_levels) - 1
+
+    # The frame must still be larger than the template at the coarsest level
+    while top > 0:
+        fh, fw = frame.level(top).shape[:2]
+        th, tw = t_levels[top].shape[:2]
+        if th <= fh and tw <= fw:
+            break
+        top -= 1
+
+    if top == 0:
+        return match_template_fft(frame, bank, path)
+
+    result = bank.buffer("result", (fh - th + 1, fw - tw + 1))
+    cv2.matchTemplate(frame.level(top), t_levels[top], cv2.TM_CCOEFF_NORMED, result=result)
+    score, (x, y) = _result_peak(result)
+    if score < threshold - PYRAMID_SLACK:
+        return float(score), (x << top, y << top)
+
+    for k in range(top - 1, -1, -1):
+        f = frame.level(k)
+        t = t_levels[k]
+        fh, fw = f.shape[:2]
+        th, tw = t.shape[:2]
+        pad_x = tw // 2 + 2
+        pad_y = th // 2 + 2
+
+        x0 = max(0, x * 2 - pad_x)
+        y0 = max(0, y * 2 - pad_y)
+        x1 = min(fw, x * 2 + tw + pad_x)
+        y1 = min(fh, y * 2 + th + pad_y)
+
+        result = cv2.matchTemplate(f[y0:y1, x0:x1], t, cv2.TM_CCOEFF_NORMED)
+        score, (rx, ry) = _result_peak(result)
+        x, y = x0 + rx, y0 + ry
+
+    return float(score), (int(x), int(y))
+
+
+def match_template_cuda(
+    frame: PreparedFrame, bank: TemplateBank, path: str, color: bool = False
+) -> tuple[float, tuple[int, int]]:
+    """
+    Full-resolution TM_CCOEFF_NORMED on the GPU, grayscale or (color=True) BGR.
+    Only the peak value and location are copied back, not the result map.
+    """
+    matchers = getattr(_cuda_local, "matchers", None)
+    if matchers is None:
+        matchers = _cuda_local.matchers = {}
+    matcher = matchers.get(color)
+    if matcher is None:
+        matcher = matchers[color] = cv2.cuda.createTemplateMatching(
+            cv2.CV_8UC3 if color else cv2.CV_8UC1, cv2.TM_CCOEFF_NORMED
+        )
+
+    H, W = frame.shape
+    stats = bank.get_stats(path)
+    h, w = stats.h, stats.w
+    if h > H or w > W:
+        return -1.0, (0, 0)
+
+    stream = frame.stream
+    frame_gpu = frame.gpu_bgr if color else frame.gpu
+    result = matcher.match(frame_gpu, bank.get_gpu(path, color), stream=stream)
+    stream.waitForCompletion()
+    _, score, _, (x, y) = cv2.cuda.minMaxLoc(result)
+    return float(score), (int(x), int(y))
+
+
+def prepare_frame(frame_bgr: np.ndarray, bank: TemplateBank, frame_gray: Optional[np.ndarray] = None) -> PreparedFrame:
+    """
+    PreparedFrame for frame_bgr, converting to grayscale into a reused buffer
+    unless frame_gray is given. With USE_CUDA the GPU uploads also go into
+    reused device buffers.
     """
-    result = cv2.matchTemplate(frame_bgr, templ_bgr, cv2.TM_CCOEFF_NORMED)
-    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-    return float(max_val), (int(max_loc[0]), int(max_loc[1]))
+    gpu_dst = gpu_bgr_dst = None
+    if USE_CUDA:
+        gpu_dst, gpu_bgr_dst = bank.gpu_buffer("gray"), bank.gpu_buffer("bgr")
+    if frame_gray is not None:
+        return PreparedFrame(frame_bgr, gray=frame_gray, gpu_dst=gpu_dst, gpu_bgr_dst=gpu_bgr_dst)
+    return PreparedFrame(
+        frame_bgr,
+        gray_dst=bank.buffer("gray", frame_bgr.shape[:2], np.uint8),
+        gpu_dst=gpu_dst,
+        gpu_bgr_dst=gpu_bgr_dst,
+    )
+
+
+def match_template_color(frame_bgr: np.ndarray, bank: TemplateBank, path: str) -> tuple[float, tuple[int, int]]:
+    """Full BGR match of one template on the CPU (frame_bgr must be dense, see _dense_bgr)."""
+    stats = bank.get_stats(path)
+    fh, fw = frame_bgr.shape[:2]
+    if stats.h > fh or stats.w > fw:
+        return -1.0, (0, 0)
+    result = bank.buffer("result", (fh - stats.h + 1, fw - stats.w + 1))
+    return match_template_once(frame_bgr, bank.get(path), result=result)
 
 
 def find_any_template_in_frame(
@@ -270,9 +1395,36 @@ def find_any_template_in_frame(
     template_paths: list[str],
     bank: TemplateBank,
     threshold: float = 0.82,
+    templates: list[np.ndarray] | None = None,
+    color: bool = False,
+    first_match: bool = True,
+    frame_gray: Optional[np.ndarray] = None,
+    prepared: Optional[PreparedFrame] = None,
 ) -> tuple[tuple[int, int, int, int] | None, dict | None]:
     """
     Try multiple templates against the SAME frame.
+    templates, if given, holds the already decoded arrays for template_paths
+    (preloaded by config_loader) so they are not read from disk again.
+
+    Matching is grayscale coarse-to-fine NCC (match_template_pyramid); the
+    frame pyramid, FFT and integral images are built once and shared by all
+    templates. Grayscale is a third of the work of BGR and is enough for
+    most UI templates.
+
+    With a CUDA-enabled OpenCV build (USE_CUDA) the match (grayscale or
+    color) runs at full resolution on the GPU instead.
+
+    color=True matches the full BGR images instead, for templates that only
+    differ by color (set "color: true" on the detector in config.yaml).
+
+    first_match=True returns as soon as one template clears threshold, and
+    templates that matched recently are tried first. Set it to False to
+    always score every template and return the best one.
+
+    frame_gray (the frame's grayscale) or prepared (a PreparedFrame of this
+    frame) let callers that match several detectors share that work;
+    without them the frame is converted here.
+
     Returns:
       bbox (x,y,w,h) if found else None,
       extra info dict (matched_path, score) if found else None
@@ -281,14 +1433,48 @@ def find_any_template_in_frame(
     best_bbox = None
     best_path = None
 
+    if templates is not None:
+        for path, templ in zip(template_paths, templates):
+            bank.add(path, templ)
+
+    global USE_CUDA
+    frame = prepared
+    if frame is None and (USE_CUDA or not color):
+        frame = prepare_frame(frame_bgr, bank, frame_gray)
+    if color:
+        frame_bgr = frame.dense_bgr() if frame is not None else _dense_bgr(frame_bgr)
+
+    if first_match:
+        template_paths = bank.order_by_hit_rate(template_paths)
+
     for path in template_paths:
-        templ = bank.get(path)
-        score, (x, y) = match_template_once(frame_bgr, templ)
+        if USE_CUDA:
+            try:
+                score, (x, y) = match_template_cuda(frame, bank, path, color)
+            except cv2.error as e:
+                print(f"CUDA template matching failed, using CPU from now on: {e}")
+                USE_CUDA = False
+                if color:
+                    score, (x, y) = match_template_color(frame_bgr, bank, path)
+                else:
+                    score, (x, y) = match_template_pyramid(frame, bank, path, threshold)
+        elif color:
+            score, (x, y) = match_template_color(frame_bgr, bank, path)
+        else:
+            score, (x, y) = match_template_pyramid(frame, bank, path, threshold)
+
+        if first_match:
+            hit = score >= threshold
+            bank.record_result(path, hit)
+            if hit:
+                stats = bank.get_stats(path)
+                return (x, y, stats.w, stats.h), {"matched_path": path, "score": score}
+
         if score > best_score:
             best_score = score
             best_path = path
-            h, w = templ.shape[:2]
-            best_bbox = (x, y, w, h)
+            stats = bank.get_stats(path)
+            best_bbox = (x, y, stats.w, stats.h)
 
     if best_score >= threshold and best_bbox is not None:
         return best_bbox, {"matched_path": best_path, "score": best_score}
@@ -315,63 +1501,303 @@ if sys.platform.startswith("win"):
         except Exception:
             pass
 
+    # clicker caches the screen size for absolute mouse coordinates; re-read it
+    # now that the process is DPI aware
+    clicker.refresh_screen_metrics()
+
 
 # =========================
 # OCR ENGINE
 # =========================
 
-def ocr_image_to_hits(pil_img: Image.Image, conf_threshold: int = 60) -> List[OcrHit]:
+def ocr_image_to_hits(img: "Image.Image | np.ndarray", conf_threshold: int = 60) -> OcrHits:
     """
-    Run Tesseract OCR and convert results into a list of OcrHit objects.
+    Run Tesseract OCR and convert results into OcrHits (column arrays).
     We use image_to_data because it includes bounding boxes + confidences.
+    With tesserocr installed the same word data comes from an in-process
+    Tesseract API instead of a tesseract.exe run per call.
+
+    img can be a PIL image, a grayscale uint8 array, or a BGR uint8 array.
+    Passing the grayscale array skips any PIL conversion here.
+    Engine/page-segmentation options come from ocr.tesseract_config in config.yaml.
     """
     # Convert to grayscale to help OCR a bit
-    gray = pil_img.convert("L")
+    if isinstance(img, np.ndarray):
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = img.convert("L")
+
+    tesserocr = _get_tesserocr()
+    if tesserocr is not None:
+        data = _tesserocr_image_to_data(tesserocr, np.asarray(gray))
+    else:
+        pytesseract = _get_pytesseract()
+        data = pytesseract.image_to_data(gray, config=CONFIG.ocr_tesseract_config, output_type=pytesseract.Output.DICT)
+
+    texts = data.get("text", [])
+    if not texts:
+        return OcrHits.empty()
+
+    # Filter on confidence for all rows at once with NumPy, then only
+    # strip the text of the rows that survive.
+    conf = _ocr_conf_array(data["conf"])
+    keep = np.flatnonzero(conf >= conf_threshold)
+    if keep.size == 0:
+        return OcrHits.empty()
+
+    stripped = [(texts[i] or "").strip() for i in keep.tolist()]
+    nonempty = np.fromiter((bool(t) for t in stripped), dtype=bool, count=len(stripped))
+    keep = keep[nonempty]
+
+    text = np.empty(keep.size, dtype=object)
+    text[:] = [t for t in stripped if t]
+    bbox = np.column_stack([
+        np.asarray(data[k], dtype=np.int32)[keep] for k in ("left", "top", "width", "height")
+    ])
+    return OcrHits(text=text, conf=conf[keep].astype(np.int32), bbox=bbox)
+
+
+def ocr_region_to_hits(
+    gray: np.ndarray,
+    roi: Optional[Tuple[int, int, int, int]],
+    conf_threshold: int = 60,
+) -> OcrHits:
+    """
+    ocr_image_to_hits on the (x0, y0, x1, y1) part of gray only, with the hit
+    bboxes shifted back to full-frame coordinates. roi None means the whole frame.
+    Tesseract time grows with pixel count, so a small roi is much cheaper.
+    """
+    if roi is None:
+        return ocr_image_to_hits(gray, conf_threshold)
+
+    x0, y0, x1, y1 = roi
+    hits = ocr_image_to_hits(gray[y0:y1, x0:x1], conf_threshold)
+    if len(hits):
+        hits.bbox[:, 0] += x0
+        hits.bbox[:, 1] += y0
+    return hits
 
-    data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT)
 
-    hits: List[OcrHit] = []
-    n = len(data.get("text", []))
+def ocr_regions_to_hits(
+    gray: np.ndarray,
+    rects: Optional[List[Tuple[int, int, int, int]]],
+    conf_threshold: int = 60,
+    cache: "Optional[OrderedDict[Any, OcrHits]]" = None,
+) -> OcrHits:
+    """
+    OCR of the (x0, y0, x1, y1) rects from ocr_roi_rects, with hit bboxes in
+    full-frame coordinates. rects None means the whole frame.
 
-    for i in range(n):
-        txt = (data["text"][i] or "").strip()
-        if not txt:
-            continue
+    Regions far apart are stacked top to bottom into one image (OCR_STACK_GAP_PX
+    blank rows between them), so one Tesseract call reads only their pixels
+    instead of the whole rect spanning them. Each hit is mapped back through the
+    region its top edge falls in.
 
-        # Tesseract sometimes returns conf as string float, sometimes "-1"
-        try:
-            conf = int(float(data["conf"][i]))
-        except Exception:
-            conf = -1
+    With cache (an OrderedDict the caller keeps), regions whose pixels were
+    OCR'd recently (same CRC) reuse those hits; the OCR_CACHE_MAX most recently
+    used results are kept. The returned hits may be shared; don't modify them.
+    """
+    if cache is None:
+        return _ocr_regions(gray, rects, conf_threshold)
+
+    crc = 0
+    for x0, y0, x1, y1 in rects or [(0, 0, gray.shape[1], gray.shape[0])]:
+        crc = zlib.crc32(np.ascontiguousarray(gray[y0:y1, x0:x1]), crc)
+    key = (tuple(rects) if rects else gray.shape, conf_threshold, crc)
+
+    hits = cache.get(key)
+    if hits is not None:
+        cache.move_to_end(key)
+        return hits
+
+    hits = _ocr_regions(gray, rects, conf_threshold)
+    cache[key] = hits
+    if len(cache) > OCR_CACHE_MAX:
+        cache.popitem(last=False)
+    return hits
 
-        if conf < conf_threshold:
-            continue
 
-        x = int(data["left"][i])
-        y = int(data["top"][i])
-        w = int(data["width"][i])
-        h = int(data["height"][i])
+def _ocr_regions(
+    gray: np.ndarray,
+    rects: Optional[List[Tuple[int, int, int, int]]],
+    conf_threshold: int,
+) -> OcrHits:
+    """ocr_regions_to_hits without the cache."""
+    if not rects:
+        return ocr_region_to_hits(gray, None, conf_threshold)
+
+    union = _union_rect(rects)
+    union_area = (union[2] - union[0]) * (union[3] - union[1])
+    area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+    if len(rects) == 1 or area > OCR_STACK_MAX_AREA_RATIO * union_area:
+        return ocr_region_to_hits(gray, union, conf_threshold)
+
+    crops = [gray[y0:y1, x0:x1] for x0, y0, x1, y1 in rects]
+    gap = OCR_STACK_GAP_PX
+    width = max(c.shape[1] for c in crops)
+    height = sum(c.shape[0] for c in crops) + gap * (len(crops) - 1)
+    # Fill with the regions' average level so the padding reads as background
+    fill = int(sum(float(c.mean()) * c.size for c in crops) / area)
+    canvas = np.full((height, width), fill, dtype=np.uint8)
+
+    tops = []
+    y = 0
+    for c in crops:
+        canvas[y:y + c.shape[0], :c.shape[1]] = c
+        tops.append(y)
+        y += c.shape[0] + gap
+
+    hits = ocr_image_to_hits(canvas, conf_threshold)
+    if len(hits):
+        band = np.searchsorted(np.asarray(tops), hits.bbox[:, 1], side="right") - 1
+        dx = np.array([r[0] for r in rects], dtype=np.int32)
+        dy = np.array([r[1] - t for r, t in zip(rects, tops)], dtype=np.int32)
+        hits.bbox[:, 0] += dx[band]
+        hits.bbox[:, 1] += dy[band]
+    return hits
 
-        hits.append(OcrHit(text=txt, conf=conf, bbox=(x, y, w, h)))
 
-    return hits
+def _ocr_conf_array(values) -> np.ndarray:
+    """
+    Tesseract confidences as an int array.
+    Tesseract sometimes returns conf as string float, sometimes "-1";
+    anything unparsable becomes -1.
+    """
+    try:
+        return np.asarray(values, dtype=np.float64).astype(np.int64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.int64)
+        for i, c in enumerate(values):
+            try:
+                out[i] = int(float(c))
+            except Exception:
+                out[i] = -1
+        return out
+
+# One long-lived MSS instance per thread instead of re-creating GDI handles per
+# grab. MSS instances are not thread-safe, and single_scan can run next to the
+# scan loop thread, so each thread keeps its own (never closed between scans;
+# the thread closes it with close_thread_sct when it is done scanning).
+_sct_local = threading.local()
+
+
+def _thread_sct():
+    """This thread's MSS instance (created on first use)."""
+    sct = getattr(_sct_local, "sct", None)
+    if sct is None:
+        sct = _sct_local.sct = mss.mss()
+    return sct
+
+
+def close_thread_sct():
+    """Close this thread's MSS instance, if it has one."""
+    sct = getattr(_sct_local, "sct", None)
+    if sct is not None:
+        _sct_local.sct = None
+        sct.close()
+
+
+# MSS BitBlts with CAPTUREBLT, which also composites layered (overlay) windows
+# into the grab and makes every capture slower. The game window isn't layered,
+# so turn it off. The constant moved to mss.windows.gdi in mss 10.
+try:
+    import mss.windows.gdi as _mss_gdi
+except Exception:
+    try:
+        import mss.windows as _mss_gdi
+    except Exception:
+        _mss_gdi = None
+if _mss_gdi is not None and hasattr(_mss_gdi, "CAPTUREBLT"):
+    _mss_gdi.CAPTUREBLT = 0
+
+# Guards the shared dxcam camera below
+_dxcam_lock = threading.Lock()
 
-def grab_rect_pil(left: int, top: int, width: int, height: int) -> Image.Image:
+# Optional DXGI Desktop Duplication capture through dxcam (Windows 8+).
+# It reads the compositor's frame directly and reports when nothing has
+# changed since the last grab, in which case the previous frame is reused.
+# Only the primary output is used; anything else falls back to MSS.
+try:
+    import dxcam
+except ImportError:
+    dxcam = None
+
+USE_DXGI_CAPTURE = dxcam is not None
+_dxcam = None
+_dxcam_last: Optional[Tuple[Tuple[int, int, int, int], np.ndarray]] = None  # (region, BGRA frame)
+
+
+def _grab_region_dxgi(left: int, top: int, width: int, height: int) -> Optional[np.ndarray]:
+    """
+    BGRA frame of the rectangle via dxcam, or None if DXGI can't serve it
+    (not on the primary output, no frame yet, or dxcam failed). Call with _dxcam_lock held.
     """
-    Capture a specific rectangle of the desktop using MSS and return a PIL Image.
+    global _dxcam, _dxcam_last, USE_DXGI_CAPTURE
+    try:
+        if _dxcam is None:
+            _dxcam = dxcam.create(output_idx=0, output_color="BGRA")
+        if left < 0 or top < 0 or left + width > _dxcam.width or top + height > _dxcam.height:
+            return None
+
+        region = (left, top, left + width, top + height)
+        img = _dxcam.grab(region=region)
+    except Exception as e:
+        print(f"DXGI capture failed, using MSS from now on: {e}")
+        USE_DXGI_CAPTURE = False
+        return None
+
+    if img is None:
+        # No new desktop frame since the last grab: the last one is still current
+        if _dxcam_last is not None and _dxcam_last[0] == region:
+            return _dxcam_last[1]
+        return None
+
+    img = np.ascontiguousarray(img)
+    _dxcam_last = (region, img)
+    return img
+
+
+def _grab_region(left: int, top: int, width: int, height: int) -> np.ndarray:
+    """
+    Grab a desktop rectangle as an (h, w, 4) BGRA uint8 array.
+    Uses DXGI when available, otherwise this thread's MSS instance (viewing its buffer, no copy).
+    """
+    left, top, width, height = int(left), int(top), int(width), int(height)
+    if USE_DXGI_CAPTURE:
+        with _dxcam_lock:
+            img = _grab_region_dxgi(left, top, width, height)
+        if img is not None:
+            return img
+
+    shot = _thread_sct().grab({"left": left, "top": top, "width": width, "height": height})
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
 
-    This is much faster than capturing all monitors.
+def grab_rect_bgra(left: int, top: int, width: int, height: int) -> np.ndarray:
+    """
+    Capture a specific rectangle of the desktop using DXGI or MSS, as an
+    (h, w, 4) BGRA uint8 array without copying the capture buffer.
     Coordinates are in global screen space (same as MSS monitor coords).
+    Slice [:, :, :3] for BGR.
+    The array may be shared with the next grab of an unchanged screen; don't write to it.
     """
-    with mss.mss() as sct:
-        region = {"left": int(left), "top": int(top), "width": int(width), "height": int(height)}
-        frame = sct.grab(region)
-        return Image.frombytes("RGB", frame.size, frame.rgb)
+    return _grab_region(left, top, width, height)
 
 
 # =========================
 # ACTIVATE TARGET WINDOW HELPERS
 # =========================
+# How often _scan_once runs the full ensure_process_running + ensure_window checks.
+# Scans in between only do the cheap window_status_still_valid check.
+ENSURE_PERIOD_S = 2.0
+
+# While frames stay unchanged, each idle scan doubles the scan interval (up to
+# IDLE_BACKOFF_MAX_DOUBLINGS times), capped at IDLE_BACKOFF_MAX_S. A changed frame
+# goes straight back to the normal interval.
+IDLE_BACKOFF_MAX_DOUBLINGS = 4
+IDLE_BACKOFF_MAX_S = 2.0
+
+
 def _enum_windows():
     """Return a list of (hwnd, title) for visible top-level windows."""
     out = []
@@ -443,6 +1869,24 @@ def bbox_center(bbox: Tuple[int, int, int, int]) -> Tuple[int, int]:
 # GUI APP
 # =========================
 
+@dataclass(frozen=True)
+class ScanSettings:
+    """
+    The Tk variables a scan reads, as plain Python values.
+    Every Variable.get() is a Tcl call (a cross-thread one from the scan thread),
+    so _scan_once and the state actions read this snapshot instead. It is
+    rebuilt whenever one of the variables is written (see App._on_scan_setting_write).
+    """
+    refresh_ms: int
+    conf_threshold: int
+    click_timer_ms: int
+    double_click_delay_ms: int
+    public_server: bool
+    private_server: bool
+    revive_enabled: bool
+    revive_limit: int
+
+
 class App:
     def __init__(self, root: tk.Tk):
         self.root = root
@@ -455,7 +1899,7 @@ class App:
             target_client_w=CONFIG.target_client_w,
             target_client_h=CONFIG.target_client_h,
         )
-        # Thread control
+        # Thread control (a new stop event per run, see start)
         self._stop_event = threading.Event()
         self._worker_thread: Optional[threading.Thread] = None
 
@@ -486,6 +1930,14 @@ class App:
         self.revive_enabled = tk.BooleanVar(value=False)
         self.revive_limit = tk.IntVar(value=1)
 
+        # Snapshot of the variables above, rebuilt by a write trace on each of them
+        self._ui = self._read_scan_settings()
+        for var in (
+            self.refresh_ms, self.conf_threshold, self.click_timer_ms, self.double_click_delay_ms,
+            self.public_server, self.private_server, self.revive_enabled, self.revive_limit,
+        ):
+            var.trace_add("write", self._on_scan_setting_write)
+
         # Debug filter Safe to remove later
         self.debug_filter = tk.StringVar(value="")
 
@@ -495,9 +1947,82 @@ class App:
 
         # Thread-safe queue to send text output to the GUI
         self.ui_queue: "queue.Queue[str]" = queue.Queue()
+        # True while a <<UiQueue>> wake-up is on its way; cleared by _pump_ui_queue
+        self._ui_wake_pending = False
+        self._ui_wake_lock = threading.Lock()
+        # (whole second, "HH:MM:SS" for it) so _log formats the clock once per second
+        self._log_second: Tuple[int, str] = (-1, "")
+        # Dropped / failed debug screenshot saves show up in the log pane
+        debugging.set_save_log(self._log)
+
+        # State -> action method; states not listed use _act_default
+        self._state_handlers: Dict[str, Any] = {
+            states.STATE_DEAD: self._act_dead,
+            states.STATE_BUY_REVIVE: self._act_buy_revive,
+            states.STATE_OK_CONFIRM_REVIVE_BOUGHT: self._act_ok_confirm_revive_bought,
+            states.STATE_AUTO_STOPPED: self._act_auto_stopped,
+            states.STATE_IN_RUN: self._act_in_run,
+            states.STATE_DISCONNECTED: self._act_disconnected,
+            states.STATE_ROBLOX_HOME_SCREEN: self._act_home_screen,
+            states.STATE_FISH_MENU: self._act_fish_menu,
+            states.STATE_FISH_MENU_SCROLLED_DOWN: self._act_fish_menu_scrolled_down,
+            states.STATE_STUCK_IN_LOBBY: self._act_stuck_in_lobby,
+            states.STATE_MENU: self._act_menu,
+            states.STATE_LEAVE_MENU: self._act_leave_menu,
+            states.STATE_NET_REVEAL: self._act_net_reveal,
+            states.STATE_PRIVATE_SERVERS_MENU: self._act_private_servers_menu,
+        }
+
+        # Detectors run every scan (the registry order from config.yaml)
+        self._detector_names: Tuple[str, ...] = tuple(CONFIG.detectors.keys())
+        self._image_detector_names, self._ocr_detector_names = split_detector_names(
+            self._detector_names, CONFIG.detectors
+        )
 
-        # Template bank
-        self.templates = TemplateBank()
+        # Each scan's results as a namedtuple with one field per detector
+        # (results.TO_LOBBY_BUTTON), and the state rules pre-resolved to its indexes.
+        # rename=True: a YAML name that is not a valid identifier (hyphen, space,
+        # keyword, leading digit or underscore) gets a positional field name
+        # instead of crashing; results are built and resolved by position.
+        self._results_type = namedtuple("DetectorResults", self._detector_names, rename=True)
+        self._state_resolver = StateResolver(self._detector_names)
+
+        # Tesseract runs here so template matching can overlap with it
+        self._ocr_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+        if CONFIG.ocr_enabled and self._ocr_detector_names:
+            self._ocr_pool.submit(warm_up_ocr)
+
+        # OCR detector name -> bbox it was last found at, for detectors without a roi
+        # (see ocr_roi_rects). Dropped on a miss or when the window moves.
+        self._ocr_anchors: Dict[str, Tuple[int, int, int, int]] = {}
+
+        # Recent OCR results by region pixels (see ocr_regions_to_hits); only the
+        # OCR thread touches it
+        self._ocr_cache: "OrderedDict[Any, OcrHits]" = OrderedDict()
+
+        # Template bank, filled in the background so the first scan doesn't pay for it
+        self.templates = TemplateBank(scale=CONFIG.detect_scale)
+        threading.Thread(target=self.templates.warm_up, args=(CONFIG.detectors,), daemon=True).start()
+
+        # Last seen window rect, used to drop cached image hits when the window moves
+        self._last_win_rect: Optional[Tuple[int, int, int, int]] = None
+
+        # Image detectors with a "roi": last (ROI pixel hash, result) per detector
+        # (see run_image_detectors). Cleared with the image cache when the window moves.
+        self._roi_results: Dict[str, Tuple[Any, DetectResult]] = {}
+
+        # Result of the last full process + window check. Scans in between only
+        # re-check it cheaply (see window_status_still_valid).
+        self._window_status = None
+        self._last_ensure_ts = 0.0
+
+        # Fingerprint of the last scanned frame and what OCR + detectors found in it.
+        # An identical next frame reuses those instead of running them again.
+        self._last_frame_key: Optional[Tuple[int, int, int]] = None
+        self._last_hits: Optional[OcrHits] = None
+        self._last_results: Optional[Tuple[DetectResult, ...]] = None
+        # Scans in a row that reused the last frame's results (see _next_scan_interval_s)
+        self._idle_scans = 0
 
         self._build_ui()
 
@@ -510,8 +2035,11 @@ class App:
         self.root.bind("<F5>", lambda _e: self.start())
         self.root.bind("<F8>", lambda _e: self.stop())
 
-        # Periodically drain UI queue so threads do not touch Tk directly
-        self._pump_ui_queue()
+        # Drain the UI queue when a worker posts to it (see _log) instead of polling.
+        # One drain once mainloop is running picks up anything logged before it
+        # started, when event_generate can fail.
+        self.root.bind("<<UiQueue>>", lambda _e: self._pump_ui_queue())
+        self.root.after_idle(self._pump_ui_queue)
 
     def _build_ui(self):
         outer = ttk.Frame(self.root, padding=12)
@@ -679,15 +2207,23 @@ class App:
         """
         Drain messages from worker threads and add them to the debug output.
         We do this because Tkinter is not thread-safe.
+        Runs on the Tk thread when _log fires the <<UiQueue>> event.
         """
+        # Clear the flag before draining: a message put after this point
+        # sends a new wake-up, one put before it is picked up below.
+        with self._ui_wake_lock:
+            self._ui_wake_pending = False
+
+        msgs = []
         try:
             while True:
-                msg = self.ui_queue.get_nowait()
-                self._append_output(msg)
+                msgs.append(self.ui_queue.get_nowait())
         except queue.Empty:
             pass
 
-        self.root.after(50, self._pump_ui_queue)
+        # One write (one file open) for the whole burst instead of one per message
+        if msgs:
+            self._append_output("\n".join(msgs))
 
     def _update_timer(self):
         """Update the elapsed time display every second while running."""
@@ -732,9 +2268,29 @@ class App:
         if not CONFIG.enable_actions_logging:
             return
 
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        now = time.time()
+        sec = int(now)
+        cached_sec, hms = self._log_second
+        if sec != cached_sec:
+            hms = time.strftime("%H:%M:%S", time.localtime(sec))
+            self._log_second = (sec, hms)
+        ts = f"{hms}.{int((now - sec) * 1000):03d}"
         self.ui_queue.put(f"[{ts}] {msg}")
 
+        # Wake the Tk thread only if no wake-up is pending; the drain empties
+        # the whole queue, so later puts ride along with it.
+        with self._ui_wake_lock:
+            if self._ui_wake_pending:
+                return
+            self._ui_wake_pending = True
+        try:
+            self.root.event_generate("<<UiQueue>>", when="tail")
+        except (RuntimeError, tk.TclError):
+            # Main loop not running (startup/shutdown): let the next _log retry;
+            # the after_idle drain from __init__ covers startup
+            with self._ui_wake_lock:
+                self._ui_wake_pending = False
+
     # =========================
     # BUTTON ACTIONS
     # =========================
@@ -744,14 +2300,16 @@ class App:
         if self.is_running.get():
             return
 
-        self._stop_event.clear()
+        # Fresh event per run: a previous loop still finishing its last scan
+        # keeps its own (set) event instead of seeing this one cleared.
+        self._stop_event = threading.Event()
         self.is_running.set(True)
 
         self.btn_start.config(state="disabled")
         self.btn_stop.config(state="normal")
         self.btn_scan.config(state="disabled")
 
-        self._worker_thread = threading.Thread(target=self._scan_loop, daemon=True)
+        self._worker_thread = threading.Thread(target=self._scan_loop, args=(self._stop_event,), daemon=True)
         self._worker_thread.start()
 
         self._timer_start = time.time()
@@ -779,35 +2337,84 @@ class App:
         Run exactly one scan.
         We run it in a thread so the UI stays responsive.
         """
-        threading.Thread(target=lambda: self._scan_once(force_refresh=True), daemon=True).start()
+        threading.Thread(target=self._single_scan_worker, daemon=True).start()
+
+    def _single_scan_worker(self):
+        try:
+            self._scan_once(force_refresh=True)
+        finally:
+            close_thread_sct()
 
     # =========================
     # CORE LOOP
     # =========================
 
-    def _scan_loop(self):
+    def _scan_loop(self, stop_event: threading.Event):
         """
-        Main scanning loop.
+        Main scanning loop, until stop_event is set.
         Each iteration:
         - capture screen
         - OCR
         - match tokens
         - print debug info
-        - sleep until next scan
+        - sleep until next scan (cut short by stop)
         """
-        while not self._stop_event.is_set():
+        while not stop_event.is_set():
             t0 = time.time()
             self._scan_once()
             dt = time.time() - t0
-            target = self.refresh_ms.get() / 1000.0
+            target = self._next_scan_interval_s()
 
             # If OCR takes longer than the target, we do not "queue scans".
             # We just run again as soon as possible (with a tiny minimum sleep).
             sleep_s = max(CONFIG.min_sleep_s, target - dt)
-            time.sleep(sleep_s)
+            stop_event.wait(sleep_s)
+
+        close_thread_sct()
 
         self._log("[run] stopped")
 
+    def _next_scan_interval_s(self) -> float:
+        """
+        Seconds between scan starts for the current state: the state's entry in
+        scan.state_refresh_ms, otherwise the refresh slider, backed off while the
+        frame stays unchanged. While IN_RUN waits for its click timer, never sleep
+        past the moment the next click is due.
+        """
+        target = CONFIG.state_refresh_ms.get(self.last_state, self._ui.refresh_ms) / 1000.0
+
+        if self._idle_scans:
+            backoff = target * (2 ** min(self._idle_scans, IDLE_BACKOFF_MAX_DOUBLINGS))
+            target = max(target, min(backoff, IDLE_BACKOFF_MAX_S))
+
+        if self.last_state == states.STATE_IN_RUN and self.last_click_time > 0:
+            timer_interval_s = self._ui.click_timer_ms / 1000.0
+            remaining = timer_interval_s - (time.time() - self.last_click_time)
+            target = min(target, max(remaining, 0.0))
+
+        return target
+
+    def _read_scan_settings(self) -> ScanSettings:
+        """Read the Tk variables a scan needs, once."""
+        return ScanSettings(
+            refresh_ms=self.refresh_ms.get(),
+            conf_threshold=int(self.conf_threshold.get()),
+            click_timer_ms=self.click_timer_ms.get(),
+            double_click_delay_ms=self.double_click_delay_ms.get(),
+            public_server=self.public_server.get(),
+            private_server=self.private_server.get(),
+            revive_enabled=self.revive_enabled.get(),
+            revive_limit=self.revive_limit.get(),
+        )
+
+    def _on_scan_setting_write(self, *_):
+        """Variable write trace: refresh the ScanSettings snapshot."""
+        try:
+            self._ui = self._read_scan_settings()
+        except (tk.TclError, ValueError):
+            # A half-typed value (e.g. an emptied spinbox); keep the last good snapshot
+            pass
+
     def _scan_once(self, force_refresh: bool = False):
         """
         One scan iteration.
@@ -815,49 +2422,82 @@ class App:
         """
         try:
             t0 = time.time()
-
-            # ENSURE PROCESS IS RUNNING
-            process_running = ensure_process_running(
-                title_contains=CONFIG.target_window_title,
-                exe_path=CONFIG.window_exe_path,
-                wait_after_launch_s=CONFIG.wait_after_launch_s,
-                log_fn=self._log,
-                launch_enabled=CONFIG.launch_if_not_found,
-            )
-
-            if not process_running:
-                self._log("[scan] Target application not running, skipping scan")
-                return
-
-            # ENSURE WINDOW EXISTS
-            if CONFIG.enforce_window_before_scan:
-                # This does fast checks first and only enforces if something is wrong.
-                # Safe to call before every scan.
-                st = ensure_window(self.window_cfg, log_fn=self._log)
-                if not st:
-                    self._log("[scan] window not found, skipping scan")
+            ui = self._ui
+
+            # Full process + window checks run at most every ENSURE_PERIOD_S.
+            # In between, the last WindowStatus is reused as long as the window
+            # still exists, is in the foreground and hasn't moved.
+            st = self._window_status
+            if (
+                force_refresh
+                or st is None
+                or t0 - self._last_ensure_ts >= ENSURE_PERIOD_S
+                or not window_status_still_valid(st)
+            ):
+                self._window_status = None
+
+                # ENSURE PROCESS IS RUNNING
+                process_running = ensure_process_running(
+                    title_contains=CONFIG.target_window_title,
+                    exe_path=CONFIG.window_exe_path,
+                    wait_after_launch_s=CONFIG.wait_after_launch_s,
+                    log_fn=self._log,
+                    launch_enabled=CONFIG.launch_if_not_found,
+                )
+
+                if not process_running:
+                    self._log("[scan] Target application not running, skipping scan")
                     return
 
+                # ENSURE WINDOW EXISTS
+                if CONFIG.enforce_window_before_scan:
+                    # This does fast checks first and only enforces if something is wrong.
+                    st = ensure_window(self.window_cfg, log_fn=self._log)
+                    if not st:
+                        self._log("[scan] window not found, skipping scan")
+                        return
+
+                self._window_status = st
+                self._last_ensure_ts = time.time()
+
+            if st.win_rect != self._last_win_rect:
+                # A moved window often means a resolution or monitor change
+                clicker.refresh_screen_metrics()
+                invalidate_image_cache()
+                self._roi_results.clear()
+                self._ocr_anchors.clear()
+                self._last_win_rect = st.win_rect
+
             # Setup capture region and capture screenshot
             wl, wt, wr, wb = st.win_rect
             w = wr - wl
             h = wb - wt
 
-            pil_img = grab_rect_pil(wl, wt, w, h)
+            # Capture as BGRA and view the first 3 channels as the BGR frame (no copy).
+            # The grayscale frame for OCR and template matching comes straight from BGRA;
+            # PIL is only built for debug saves.
+            frame_bgra = grab_rect_bgra(wl, wt, w, h)
+            frame_bgr = frame_bgra[:, :, :3]
+
+            # Idle screens: if this frame matches the last one (CRC of every 8th pixel
+            # in both directions, plus size and OCR threshold), reuse the last OCR +
+            # detector results. Actions below still run so timers keep advancing.
+            conf_threshold = ui.conf_threshold
+            frame_key = (
+                zlib.crc32(np.ascontiguousarray(frame_bgra[::8, ::8])),
+                frame_bgra.shape[0] * 65536 + frame_bgra.shape[1],
+                conf_threshold,
+            )
+            reuse = (
+                not force_refresh
+                and frame_key == self._last_frame_key
+                and self._last_results is not None
+            )
 
-            # Convert PIL screenshot (RGB) -> OpenCV frame (BGR) once per scan
-            frame_rgb = np.array(pil_img)
-            frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+            frame_gray = None if reuse else cv2.cvtColor(frame_bgra, cv2.COLOR_BGRA2GRAY)
             
-            # OCR -> hits (skip if OCR is disabled in config)
-            if CONFIG.ocr_enabled:
-                hits = ocr_image_to_hits(pil_img, conf_threshold=int(self.conf_threshold.get()))
-            else:
-                hits = []
-
             # Run detectors (choose which ones you care about for now)
-            # run all detectors in the registry
-            detector_names = list(CONFIG.detectors.keys())
+            # run all detectors in the registry (self._detector_names, built once in __init__)
             """
             detector_names = [
                 "AUTO_RED_ICON",
@@ -867,29 +2507,53 @@ class App:
                 "END_RUN_BUTTON",
             ]"""
 
-            # For state_machine detection to determine state, we want to run all detectors fresh every scan (no cache).
-            results = run_detectors(
-                detector_names=detector_names,
-                hits=hits,
-                frame_bgr=frame_bgr,
-                bank=self.templates,
-                detectors_dict=CONFIG.detectors,
-            )
-
-            # 4) Build signals from detector results (for backward compatibility or custom logic)
-            signals = {
-                "has_auto_red": results["AUTO_RED_ICON"].found,
-                "has_auto_green": results["AUTO_GREEN_ICON"].found,
-                "has_end_run": results["END_RUN_BUTTON"].found,
-                "has_to_lobby": results["TO_LOBBY_BUTTON"].found,
-                "has_switch_fish": results["SWITCH_FISH_ICON"].found,
-                "has_leave": results["LEAVE_BUTTON"].found,
-                "has_disconnected": results["DISCONNECTED_ICON"].found,
-                "has_home_screen": results["ROBLOX_HOME_SCREEN"].found,
-            }
-
-            # 5) Resolve state from detector results using state machine
-            current_state = resolve_state(results)
+            # For state_machine detection to determine state, we want to run all detectors fresh
+            # every scan (no cache), unless the frame is unchanged from the last scan.
+            if reuse:
+                hits = self._last_hits
+                results = self._last_results
+                self._idle_scans += 1
+            else:
+                self._idle_scans = 0
+                # OCR -> hits on its own thread (skip if OCR is disabled in config
+                # or no OCR detector is registered), while the image detectors
+                # match templates on this one. Both Tesseract and OpenCV release the GIL.
+                ocr_future = None
+                if CONFIG.ocr_enabled and self._ocr_detector_names:
+                    rects = ocr_roi_rects(self._ocr_detector_names, CONFIG.detectors, w, h, self._ocr_anchors)
+                    ocr_future = self._ocr_pool.submit(
+                        ocr_regions_to_hits, frame_gray, rects, conf_threshold, self._ocr_cache
+                    )
+
+                image_results = run_image_detectors(
+                    self._image_detector_names,
+                    frame_bgr=frame_bgr,
+                    bank=self.templates,
+                    detectors_dict=CONFIG.detectors,
+                    frame_gray=frame_gray,
+                    roi_cache=self._roi_results,
+                )
+
+                hits = ocr_future.result() if ocr_future is not None else OcrHits.empty()
+                ocr_results = run_ocr_detectors(self._ocr_detector_names, hits, CONFIG.detectors)
+                for name, res in ocr_results.items():
+                    if CONFIG.detectors[name].get("roi"):
+                        continue
+                    if res.found and res.bbox:
+                        self._ocr_anchors[name] = res.bbox
+                    else:
+                        self._ocr_anchors.pop(name, None)
+
+                results = self._results_type._make(
+                    image_results[name] if name in image_results else ocr_results[name]
+                    for name in self._detector_names
+                )
+                self._last_frame_key = frame_key
+                self._last_hits = hits
+                self._last_results = results
+
+            # 4) Resolve state from detector results using state machine
+            current_state = self._state_resolver.resolve(results)
             # self._log(f"[state] {current_state}")  # Disabled - shown in UI
 
             # Update UI state display
@@ -899,207 +2563,20 @@ class App:
             if current_state != self.last_state:
                 self.last_state = current_state
                 self.state_start_time = time.time()
+                # Scan the next frame fresh after a state change
+                self._last_frame_key = None
 
-            state_duration = time.time() - self.state_start_time
+            # Nothing recognised: the window may have changed under us,
+            # so run the full window check on the next scan.
+            if current_state == states.STATE_UNKNOWN:
+                self._window_status = None
 
-            # 6) Take actions based on state
-            # State-based action handler
-            if current_state == states.STATE_DEAD:
-                if self.revive_enabled.get():
-                    if self.revive_limit.get() == 0:
-                        # Revive limit exhausted - enable private server and click menu icon
-                        self._log(f"[action] DEAD+REVIVE - limit reached, enabling private server and clicking menu icon")
-                        self.private_server.set(True)
-                        self.public_server.set(False)
-                        if results["MENU_ICON"].found and results["MENU_ICON"].bbox:
-                            center = bbox_center(results["MENU_ICON"].bbox)
-                            click_point(st.win_rect, center, clicks=1)
-                    else:
-                        # Revive mode: first ensure auto is off, then click revive button
-                        if results["AUTO_RED_ICON"].found:
-                            # Auto is already off (red) - click the revive button
-                            if results["REVIVE_BUTTON"].found and results["REVIVE_BUTTON"].bbox:
-                                center = bbox_center(results["REVIVE_BUTTON"].bbox)
-                                self._log(f"[action] DEAD+REVIVE - auto off, clicking revive button at {center}")
-                                click_point(st.win_rect, center, clicks=1)
-                                time.sleep(3.0)
-                        else:
-                            # Auto is still on - turn it off first
-                            self._log(f"[action] DEAD+REVIVE - clicking AUTO_BUTTON to turn off auto")
-                            click_point(st.win_rect, CLICK_POINTS["AUTO_BUTTON"], clicks=1)
-                else:
-                    # Normal dead state - click to_lobby button
-                    if results["TO_LOBBY_BUTTON"].found and results["TO_LOBBY_BUTTON"].bbox:
-                        center = bbox_center(results["TO_LOBBY_BUTTON"].bbox)
-                        self._log(f"[action] DEAD detected - clicking to_lobby at {center}")
-                        click_point(st.win_rect, center, clicks=1)
-
-            elif current_state == states.STATE_BUY_REVIVE:
-                # Buy revive dialog - click the buy revive button
-                if results["BUY_REVIVE_BUTTON"].found and results["BUY_REVIVE_BUTTON"].bbox:
-                    center = bbox_center(results["BUY_REVIVE_BUTTON"].bbox)
-                    self._log(f"[action] BUY_REVIVE detected - clicking buy revive at {center}")
-                    click_point(st.win_rect, center, clicks=1)
-                    time.sleep(3)
-
-            elif current_state == states.STATE_OK_CONFIRM_REVIVE_BOUGHT:
-                # Revive purchase confirmed - click OK to dismiss
-                if results["OK_CONFIRM_REVIVE_BOUGHT_BUTTON"].found and results["OK_CONFIRM_REVIVE_BOUGHT_BUTTON"].bbox:
-                    center = bbox_center(results["OK_CONFIRM_REVIVE_BOUGHT_BUTTON"].bbox)
-                    self._log(f"[action] OK_CONFIRM_REVIVE_BOUGHT detected - clicking confirm at {center}")
-                    click_point(st.win_rect, center, clicks=1)
-                    # Decrease revive limit (floor at 0)
-                    current_limit = self.revive_limit.get()
-                    if current_limit > 0:
-                        self.revive_limit.set(current_limit - 1)
-                        self._log(f"[action] Revive limit decreased to {current_limit - 1}")
-
-            elif current_state == states.STATE_AUTO_STOPPED:
-                # Auto has stopped - click AUTO_BUTTON once to restart it
-                self._log(f"[action] AUTO_STOPPED detected - clicking AUTO_BUTTON to restart")
-                click_point(st.win_rect, CLICK_POINTS["AUTO_BUTTON"], clicks=1)
-
-            elif current_state == states.STATE_IN_RUN:
-                current_time = time.time()
-                # Check if timer has elapsed (convert ms to seconds)
-                timer_interval_s = self.click_timer_ms.get() / 1000.0
-
-                if self.last_click_time == 0:
-                    # First time in IN_RUN state, click immediately
-                    click_point(st.win_rect, CLICK_POINTS["AUTO_BUTTON"], clicks=2, delay_ms=self.double_click_delay_ms.get())
-                    self.last_click_time = current_time
-                elif (current_time - self.last_click_time) >= timer_interval_s:
-                    # Timer has elapsed, run click routine
-                    time_since_last = current_time - self.last_click_time
-                    click_point(st.win_rect, CLICK_POINTS["AUTO_BUTTON"], clicks=2, delay_ms=self.double_click_delay_ms.get())
-                    # Reset timer
-                    self.last_click_time = current_time
-                """ else:
-                    # Log the timer countdown occasionally (every 10 seconds worth of scans)
-                    time_remaining = timer_interval_s - (current_time - self.last_click_time)
-                    if int(current_time - self.last_click_time) % 10 < (self.refresh_ms.get() / 1000.0):
-                        self._log(f"[click] IN_RUN - Next click in {time_remaining:.1f}s") """
-
-            elif current_state == states.STATE_DISCONNECTED:
-                # Disconnected - click the center of the disconnected icon to reconnect
-                if results["DISCONNECTED_ICON"].found and results["DISCONNECTED_ICON"].bbox:
-                    center = bbox_center(results["DISCONNECT_LEAVE_BUTTON"].bbox)
-                    self._log(f"[action] DISCONNECTED detected - clicking center of disconnected_leave_button icon at {center}")
-                    click_point(st.win_rect, center, clicks=1)
-
-            elif current_state == states.STATE_ROBLOX_HOME_SCREEN:
-                # Home screen - click the center of the game icon or scroll if not found
-                if results["HOME_SCREEN_GAME_ICON"].found and results["HOME_SCREEN_GAME_ICON"].bbox:
-                    center = bbox_center(results["HOME_SCREEN_GAME_ICON"].bbox)
-                    self._log(f"[action] BE_FISH_HOME_SCREEN_GAME_ICON detected - clicking game icon at {center}")
-                    click_point(st.win_rect, center, clicks=1)
-                else:
-                    # Game icon not found, scroll down
-                    self._log(f"[action] ROBLOX_HOME_SCREEN detected - game icon not found, scrolling down")
-                    center_x = (st.win_rect[2] - st.win_rect[0]) // 2
-                    center_y = (st.win_rect[3] - st.win_rect[1]) // 2
-                    scroll_view(st.win_rect, (center_x, center_y), direction="down", clicks=3)
-
-            elif current_state == states.STATE_FISH_MENU:
-                # Fish menu screen - behavior depends on server type
-                if self.public_server.get():
-                    # Public server: click quick join button
-                    if results["QUICK_JOIN_ICON"].found and results["QUICK_JOIN_ICON"].bbox:
-                        center = bbox_center(results["QUICK_JOIN_ICON"].bbox)
-                        self._log(f"[action] FISH_MENU detected (public) - clicking quick join at {center}")
-                        click_point(st.win_rect, center, clicks=1)
-                    else:
-                        # Quick join not found, scroll to look for it
-                        self._log(f"[action] FISH_MENU detected (public) - quick join not found, scrolling up to find it")
-                        center_x = (st.win_rect[2] - st.win_rect[0]) // 2
-                        center_y = (st.win_rect[3] - st.win_rect[1]) // 2
-                        scroll_view(st.win_rect, (center_x, center_y), direction="up", clicks=3)
-                elif self.private_server.get():
-                    # Private server: scroll down to find servers button
-                    self._log(f"[action] FISH_MENU detected (private) - scrolling down")
-                    # Scroll in the center of the window
-                    center_x = (st.win_rect[2] - st.win_rect[0]) // 2
-                    center_y = (st.win_rect[3] - st.win_rect[1]) // 2
-                    scroll_view(st.win_rect, (center_x, center_y), direction="down", clicks=3)
-
-            elif current_state == states.STATE_FISH_MENU_SCROLLED_DOWN:
-                # Fish menu scrolled down - behavior depends on server type
-                if self.public_server.get():
-                    # Public server: scroll back up
-                    self._log(f"[action] FISH_MENU_SCROLLED_DOWN detected (public) - scrolling up")
-                    center_x = (st.win_rect[2] - st.win_rect[0]) // 2
-                    center_y = (st.win_rect[3] - st.win_rect[1]) // 2
-                    scroll_view(st.win_rect, (center_x, center_y), direction="up", clicks=3)
-                elif self.private_server.get():
-                    # Private server: look for servers_button
-                    if results["SERVERS_BUTTON"].found and results["SERVERS_BUTTON"].bbox:
-                        center = bbox_center(results["SERVERS_BUTTON"].bbox)
-                        self._log(f"[action] FISH_MENU_SCROLLED_DOWN detected (private) - clicking servers_button at {center}")
-                        click_point(st.win_rect, center, clicks=1)
-                    else:
-                        # If not found, scroll down more
-                        self._log(f"[action] FISH_MENU_SCROLLED_DOWN detected (private) - servers_button not found, scrolling down")
-                        center_x = (st.win_rect[2] - st.win_rect[0]) // 2
-                        center_y = (st.win_rect[3] - st.win_rect[1]) // 2
-                        scroll_view(st.win_rect, (center_x, center_y), direction="down", clicks=3)
-
-            elif current_state == states.STATE_STUCK_IN_LOBBY:
-                # Stuck in lobby - only take action after 15 seconds
-                if state_duration >= 15.0:
-                    if results["MENU_ICON"].found and results["MENU_ICON"].bbox:
-                        center = bbox_center(results["MENU_ICON"].bbox)
-                        self._log(f"[action] STUCK_IN_LOBBY for {state_duration:.1f}s - clicking menu icon at {center}")
-                        click_point(st.win_rect, center, clicks=1)
-                else:
-                    # Log countdown occasionally (every 5 seconds)
-                    if int(state_duration) % 5 < (self.refresh_ms.get() / 1000.0):
-                        remaining = 15.0 - state_duration
-                        self._log(f"[action] STUCK_IN_LOBBY - waiting {remaining:.1f}s before action")
-
-            elif current_state == states.STATE_MENU:
-                # Menu screen - click the center of the leave button
-                if results["LEAVE_BUTTON"].found and results["LEAVE_BUTTON"].bbox:
-                    center = bbox_center(results["LEAVE_BUTTON"].bbox)
-                    self._log(f"[action] MENU detected - clicking leave button at {center}")
-                    click_point(st.win_rect, center, clicks=1)
-
-            elif current_state == states.STATE_LEAVE_MENU:
-                # Leave menu confirmation - click the center of the leave confirm button
-                if results["LEAVE_BUTTON_CONFIRM"].found and results["LEAVE_BUTTON_CONFIRM"].bbox:
-                    center = bbox_center(results["LEAVE_BUTTON_CONFIRM"].bbox)
-                    self._log(f"[action] LEAVE_MENU detected - clicking leave confirm at {center}")
-                    click_point(st.win_rect, center, clicks=1)
-
-            elif current_state == states.STATE_NET_REVEAL:
-                # Net Reveal state. Click Menu to leave and skip net reveal animations
-                if results["MENU_ICON"].found and results["MENU_ICON"].bbox:
-                        center = bbox_center(results["MENU_ICON"].bbox)
-                        self._log(f"[action] NET_REVEAL detected - clicking menu icon at {center}")
-                        click_point(st.win_rect, center, clicks=1)
-
-            elif current_state == states.STATE_PRIVATE_SERVERS_MENU:
-                # Private servers menu - look for ROLLA_SERVER and click it
-                if results["ROLLA_SERVER"].found and results["ROLLA_SERVER"].bbox:
-                    # Get the ROLLA_SERVER bbox
-                    x, y, w, h = results["ROLLA_SERVER"].bbox
-                    # Click at center horizontally, 10px from bottom of the button
-                    center_x = x + (w // 2)
-                    click_y = y + h - 10  # 10px from bottom of the button
-                    click_pos = (center_x, click_y)
-                    self._log(f"[action] PRIVATE_SERVERS_MENU detected - clicking ROLLA_SERVER at {click_pos}")
-                    click_point(st.win_rect, click_pos, clicks=1)
-                else:
-                    # ROLLA_SERVER not found, scroll down to look for it
-                    self._log(f"[action] PRIVATE_SERVERS_MENU detected - ROLLA_SERVER not found, scrolling up")
-                    center_x = (st.win_rect[2] - st.win_rect[0]) // 2
-                    center_y = (st.win_rect[3] - st.win_rect[1]) // 2
-                    scroll_view(st.win_rect, (center_x, center_y), direction="up", clicks=3)
+            state_duration = time.time() - self.state_start_time
 
-            else:
-                # Reset timer when not in IN_RUN state
-                if self.last_click_time != 0:
-                    self._log(f"[click] State changed from IN_RUN to {current_state}, resetting timer")
-                self.last_click_time = 0
+            # 5) Take actions based on state
+            # State-based action handler (see _state_handlers / the _act_* methods below)
+            handler = self._state_handlers.get(current_state, self._act_default)
+            handler(results, st, state_duration)
 
             dt_ms = int((time.time() - t0) * 1000)
 
@@ -1109,28 +2586,22 @@ class App:
             # Safe to comment out later
             # =========================
 
-            # Annotated Screen Shot Save
+            # Raw + annotated screenshots; converting, drawing and PNG encoding
+            # happen on debugging's save thread, not here.
             if debugging.DEBUG_SAVE_SCREENSHOTS and (debugging.DEBUG_SAVE_EVERY_SCAN or (not self.is_running.get())):
                 try:
-                    annotated = debugging.draw_ocr_boxes(pil_img, hits, max_boxes=None)
-                    saved_path = debugging.save_debug_screenshot(annotated, subfolder="debug_shots", prefix="annotated")
-                    self._log(f"[debug] saved annotated screenshot: {saved_path}")
+                    raw_path, annotated_path = debugging.save_debug_frame(frame_bgr, hits, subfolder="debug_shots")
+                    self._log(f"[debug] queued annotated screenshot: {annotated_path}")
+                    self._log(f"[debug] queued screenshot: {raw_path}")
                 except Exception as e:
-                    self._log(f"[debug] annotated save FAILED: {type(e).__name__}: {e}")
+                    self._log(f"[debug] screenshot save FAILED: {type(e).__name__}: {e}")
 
             # Print detector results
             # Option A: keep your loop (works fine)
             # Option B: use helper so main.py stays clean
             
-            # debugging.log_detectors(results, self._log, filter_text=self.debug_filter.get())
-
-            # Save raw screenshot if enabled
-            try:
-                if debugging.DEBUG_SAVE_SCREENSHOTS and (debugging.DEBUG_SAVE_EVERY_SCAN or (not self.is_running.get())):
-                    saved_path = debugging.save_debug_screenshot(pil_img, subfolder="debug_shots", prefix="desktop")
-                    self._log(f"[debug] saved screenshot: {saved_path}")
-            except Exception as e:
-                self._log(f"[debug] screenshot save FAILED: {type(e).__name__}: {e}")
+            # results is a namedtuple; zip with the names (renamed fields lose them)
+            # debugging.log_detectors(dict(zip(self._detector_names, results)), self._log, filter_text=self.debug_filter.get())
 
             # =========================
             # DEBUG OUTPUT END
@@ -1140,6 +2611,210 @@ class App:
         except Exception as e:
             self._log(f"[error] {type(e).__name__}: {e}")
 
+    # =========================
+    # STATE ACTIONS
+    # One method per state, looked up in self._state_handlers by _scan_once.
+    # Each gets this scan's detector results, the window state (st.win_rect)
+    # and how long the current state has lasted.
+    # =========================
+
+    def _act_dead(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        if self._ui.revive_enabled:
+            if self._ui.revive_limit == 0:
+                # Revive limit exhausted - enable private server and click menu icon
+                self._log(f"[action] DEAD+REVIVE - limit reached, enabling private server and clicking menu icon")
+                self.private_server.set(True)
+                self.public_server.set(False)
+                if results.MENU_ICON.found and results.MENU_ICON.bbox:
+                    center = bbox_center(results.MENU_ICON.bbox)
+                    click_point(st.win_rect, center, clicks=1)
+            else:
+                # Revive mode: first ensure auto is off, then click revive button
+                if results.AUTO_RED_ICON.found:
+                    # Auto is already off (red) - click the revive button
+                    if results.REVIVE_BUTTON.found and results.REVIVE_BUTTON.bbox:
+                        center = bbox_center(results.REVIVE_BUTTON.bbox)
+                        self._log(f"[action] DEAD+REVIVE - auto off, clicking revive button at {center}")
+                        click_point(st.win_rect, center, clicks=1)
+                        time.sleep(3.0)
+                else:
+                    # Auto is still on - turn it off first
+                    self._log(f"[action] DEAD+REVIVE - clicking AUTO_BUTTON to turn off auto")
+                    click_by_name(st.win_rect, "AUTO_BUTTON", clicks=1)
+        else:
+            # Normal dead state - click to_lobby button
+            if results.TO_LOBBY_BUTTON.found and results.TO_LOBBY_BUTTON.bbox:
+                center = bbox_center(results.TO_LOBBY_BUTTON.bbox)
+                self._log(f"[action] DEAD detected - clicking to_lobby at {center}")
+                click_point(st.win_rect, center, clicks=1)
+
+    def _act_buy_revive(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Buy revive dialog - click the buy revive button
+        if results.BUY_REVIVE_BUTTON.found and results.BUY_REVIVE_BUTTON.bbox:
+            center = bbox_center(results.BUY_REVIVE_BUTTON.bbox)
+            self._log(f"[action] BUY_REVIVE detected - clicking buy revive at {center}")
+            click_point(st.win_rect, center, clicks=1)
+            time.sleep(3)
+
+    def _act_ok_confirm_revive_bought(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Revive purchase confirmed - click OK to dismiss
+        if results.OK_CONFIRM_REVIVE_BOUGHT_BUTTON.found and results.OK_CONFIRM_REVIVE_BOUGHT_BUTTON.bbox:
+            center = bbox_center(results.OK_CONFIRM_REVIVE_BOUGHT_BUTTON.bbox)
+            self._log(f"[action] OK_CONFIRM_REVIVE_BOUGHT detected - clicking confirm at {center}")
+            click_point(st.win_rect, center, clicks=1)
+            # Decrease revive limit (floor at 0)
+            current_limit = self._ui.revive_limit
+            if current_limit > 0:
+                self.revive_limit.set(current_limit - 1)
+                self._log(f"[action] Revive limit decreased to {current_limit - 1}")
+
+    def _act_auto_stopped(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Auto has stopped - click AUTO_BUTTON once to restart it
+        self._log(f"[action] AUTO_STOPPED detected - clicking AUTO_BUTTON to restart")
+        click_by_name(st.win_rect, "AUTO_BUTTON", clicks=1)
+
+    def _act_in_run(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        current_time = time.time()
+        # Check if timer has elapsed (convert ms to seconds)
+        timer_interval_s = self._ui.click_timer_ms / 1000.0
+
+        if self.last_click_time == 0:
+            # First time in IN_RUN state, click immediately
+            click_by_name(st.win_rect, "AUTO_BUTTON", clicks=2, delay_ms=self._ui.double_click_delay_ms)
+            self.last_click_time = current_time
+        elif (current_time - self.last_click_time) >= timer_interval_s:
+            # Timer has elapsed, run click routine
+            time_since_last = current_time - self.last_click_time
+            click_by_name(st.win_rect, "AUTO_BUTTON", clicks=2, delay_ms=self._ui.double_click_delay_ms)
+            # Reset timer
+            self.last_click_time = current_time
+        """ else:
+            # Log the timer countdown occasionally (every 10 seconds worth of scans)
+            time_remaining = timer_interval_s - (current_time - self.last_click_time)
+            if int(current_time - self.last_click_time) % 10 < (self._ui.refresh_ms / 1000.0):
+                self._log(f"[click] IN_RUN - Next click in {time_remaining:.1f}s") """
+
+    def _act_disconnected(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Disconnected - click the center of the disconnected icon to reconnect
+        if results.DISCONNECTED_ICON.found and results.DISCONNECTED_ICON.bbox:
+            center = bbox_center(results.DISCONNECT_LEAVE_BUTTON.bbox)
+            self._log(f"[action] DISCONNECTED detected - clicking center of disconnected_leave_button icon at {center}")
+            click_point(st.win_rect, center, clicks=1)
+
+    def _act_home_screen(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Home screen - click the center of the game icon or scroll if not found
+        if results.HOME_SCREEN_GAME_ICON.found and results.HOME_SCREEN_GAME_ICON.bbox:
+            center = bbox_center(results.HOME_SCREEN_GAME_ICON.bbox)
+            self._log(f"[action] BE_FISH_HOME_SCREEN_GAME_ICON detected - clicking game icon at {center}")
+            click_point(st.win_rect, center, clicks=1)
+        else:
+            # Game icon not found, scroll down
+            self._log(f"[action] ROBLOX_HOME_SCREEN detected - game icon not found, scrolling down")
+            center_x = (st.win_rect[2] - st.win_rect[0]) // 2
+            center_y = (st.win_rect[3] - st.win_rect[1]) // 2
+            scroll_view(st.win_rect, (center_x, center_y), direction="down", clicks=3)
+
+    def _act_fish_menu(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Fish menu screen - behavior depends on server type
+        if self._ui.public_server:
+            # Public server: click quick join button
+            if results.QUICK_JOIN_ICON.found and results.QUICK_JOIN_ICON.bbox:
+                center = bbox_center(results.QUICK_JOIN_ICON.bbox)
+                self._log(f"[action] FISH_MENU detected (public) - clicking quick join at {center}")
+                click_point(st.win_rect, center, clicks=1)
+            else:
+                # Quick join not found, scroll to look for it
+                self._log(f"[action] FISH_MENU detected (public) - quick join not found, scrolling up to find it")
+                center_x = (st.win_rect[2] - st.win_rect[0]) // 2
+                center_y = (st.win_rect[3] - st.win_rect[1]) // 2
+                scroll_view(st.win_rect, (center_x, center_y), direction="up", clicks=3)
+        elif self._ui.private_server:
+            # Private server: scroll down to find servers button
+            self._log(f"[action] FISH_MENU detected (private) - scrolling down")
+            # Scroll in the center of the window
+            center_x = (st.win_rect[2] - st.win_rect[0]) // 2
+            center_y = (st.win_rect[3] - st.win_rect[1]) // 2
+            scroll_view(st.win_rect, (center_x, center_y), direction="down", clicks=3)
+
+    def _act_fish_menu_scrolled_down(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Fish menu scrolled down - behavior depends on server type
+        if self._ui.public_server:
+            # Public server: scroll back up
+            self._log(f"[action] FISH_MENU_SCROLLED_DOWN detected (public) - scrolling up")
+            center_x = (st.win_rect[2] - st.win_rect[0]) // 2
+            center_y = (st.win_rect[3] - st.win_rect[1]) // 2
+            scroll_view(st.win_rect, (center_x, center_y), direction="up", clicks=3)
+        elif self._ui.private_server:
+            # Private server: look for servers_button
+            if results.SERVERS_BUTTON.found and results.SERVERS_BUTTON.bbox:
+                center = bbox_center(results.SERVERS_BUTTON.bbox)
+                self._log(f"[action] FISH_MENU_SCROLLED_DOWN detected (private) - clicking servers_button at {center}")
+                click_point(st.win_rect, center, clicks=1)
+            else:
+                # If not found, scroll down more
+                self._log(f"[action] FISH_MENU_SCROLLED_DOWN detected (private) - servers_button not found, scrolling down")
+                center_x = (st.win_rect[2] - st.win_rect[0]) // 2
+                center_y = (st.win_rect[3] - st.win_rect[1]) // 2
+                scroll_view(st.win_rect, (center_x, center_y), direction="down", clicks=3)
+
+    def _act_stuck_in_lobby(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Stuck in lobby - only take action after 15 seconds
+        if state_duration >= 15.0:
+            if results.MENU_ICON.found and results.MENU_ICON.bbox:
+                center = bbox_center(results.MENU_ICON.bbox)
+                self._log(f"[action] STUCK_IN_LOBBY for {state_duration:.1f}s - clicking menu icon at {center}")
+                click_point(st.win_rect, center, clicks=1)
+        else:
+            # Log countdown occasionally (every 5 seconds)
+            if int(state_duration) % 5 < (self._ui.refresh_ms / 1000.0):
+                remaining = 15.0 - state_duration
+                self._log(f"[action] STUCK_IN_LOBBY - waiting {remaining:.1f}s before action")
+
+    def _act_menu(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Menu screen - click the center of the leave button
+        if results.LEAVE_BUTTON.found and results.LEAVE_BUTTON.bbox:
+            center = bbox_center(results.LEAVE_BUTTON.bbox)
+            self._log(f"[action] MENU detected - clicking leave button at {center}")
+            click_point(st.win_rect, center, clicks=1)
+
+    def _act_leave_menu(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Leave menu confirmation - click the center of the leave confirm button
+        if results.LEAVE_BUTTON_CONFIRM.found and results.LEAVE_BUTTON_CONFIRM.bbox:
+            center = bbox_center(results.LEAVE_BUTTON_CONFIRM.bbox)
+            self._log(f"[action] LEAVE_MENU detected - clicking leave confirm at {center}")
+            click_point(st.win_rect, center, clicks=1)
+
+    def _act_net_reveal(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Net Reveal state. Click Menu to leave and skip net reveal animations
+        if results.MENU_ICON.found and results.MENU_ICON.bbox:
+                center = bbox_center(results.MENU_ICON.bbox)
+                self._log(f"[action] NET_REVEAL detected - clicking menu icon at {center}")
+                click_point(st.win_rect, center, clicks=1)
+
+    def _act_private_servers_menu(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Private servers menu - look for ROLLA_SERVER and click it
+        if results.ROLLA_SERVER.found and results.ROLLA_SERVER.bbox:
+            # Get the ROLLA_SERVER bbox
+            x, y, w, h = results.ROLLA_SERVER.bbox
+            # Click at center horizontally, 10px from bottom of the button
+            center_x = x + (w // 2)
+            click_y = y + h - 10  # 10px from bottom of the button
+            click_pos = (center_x, click_y)
+            self._log(f"[action] PRIVATE_SERVERS_MENU detected - clicking ROLLA_SERVER at {click_pos}")
+            click_point(st.win_rect, click_pos, clicks=1)
+        else:
+            # ROLLA_SERVER not found, scroll down to look for it
+            self._log(f"[action] PRIVATE_SERVERS_MENU detected - ROLLA_SERVER not found, scrolling up")
+            center_x = (st.win_rect[2] - st.win_rect[0]) // 2
+            center_y = (st.win_rect[3] - st.win_rect[1]) // 2
+            scroll_view(st.win_rect, (center_x, center_y), direction="up", clicks=3)
+
+    def _act_default(self, results: Tuple[DetectResult, ...], st, state_duration: float):
+        # Reset timer when not in IN_RUN state
+        if self.last_click_time != 0:
+            self._log(f"[click] State changed from IN_RUN to {self.last_state}, resetting timer")
+        self.last_click_time = 0
+
 
 def main():
     """
@@ -1165,6 +2840,16 @@ def main():
 
     root = tk.Tk()
     app = App(root)
+
+    def on_close():
+        app.stop()
+        # Write the screenshots still queued on the save thread. Its messages go
+        # to print from here on: the Tk thread is blocked in the flush.
+        debugging.set_save_log(print)
+        debugging.flush_debug_screenshots()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
     root.mainloop()
 
 
@@ -24,43 +24,21 @@ from __future__ import annotations
 import time
 import subprocess
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Callable, FrozenSet, Optional
 
 import win32gui
 import win32process
 import psutil
 
+# One shared implementation (and one last-found-hwnd cache) for both modules
+from window_manager import find_window_by_title_contains
 
-def find_window_by_title_contains(title_contains: str) -> Optional[int]:
-    """
-    Find the first visible top-level window whose title contains the given substring.
-    
-    Args:
-        title_contains: Substring to search for (case-insensitive)
-        
-    Returns:
-        Window handle (hwnd) if found, None otherwise
-    """
-    title_contains_lower = title_contains.lower().strip()
-    found_hwnd: Optional[int] = None
-
-    def enum_cb(hwnd, _):
-        nonlocal found_hwnd
-        if found_hwnd is not None:
-            return  # already found one
 
-        if not win32gui.IsWindowVisible(hwnd):
-            return
-
-        title = win32gui.GetWindowText(hwnd).strip()
-        if not title:
-            return
-
-        if title_contains_lower in title.lower():
-            found_hwnd = hwnd
-
-    win32gui.EnumWindows(enum_cb, None)
-    return found_hwnd
+# Lowercased names of all running processes, reused for PROCESS_NAMES_TTL_S
+# (one process_iter walk serves every is_process_running_by_name call in that time).
+PROCESS_NAMES_TTL_S = 1.0
+_process_names: Optional[FrozenSet[str]] = None
+_process_names_ts = 0.0
 
 
 def get_process_name_from_window(hwnd: int) -> Optional[str]:
@@ -84,6 +62,7 @@ def get_process_name_from_window(hwnd: int) -> Optional[str]:
 def is_process_running_by_name(process_name: str) -> bool:
     """
     Check if a process with the given name is currently running.
+    The list of running process names is cached for PROCESS_NAMES_TTL_S.
     
     Args:
         process_name: Name of the process (e.g., "RobloxPlayerBeta.exe")
@@ -91,16 +70,22 @@ def is_process_running_by_name(process_name: str) -> bool:
     Returns:
         True if at least one instance is running, False otherwise
     """
-    process_name_lower = process_name.lower()
-    
-    for proc in psutil.process_iter(['name']):
-        try:
-            if proc.info['name'].lower() == process_name_lower:
-                return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
-    
-    return False
+    global _process_names, _process_names_ts
+
+    now = time.monotonic()
+    if _process_names is None or now - _process_names_ts >= PROCESS_NAMES_TTL_S:
+        names = set()
+        for proc in psutil.process_iter(['name']):
+            try:
+                name = proc.info['name']
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            if name:
+                names.add(name.lower())
+        _process_names = frozenset(names)
+        _process_names_ts = now
+
+    return process_name.lower() in _process_names
 
 
 def launch_application(exe_path: str, log_fn: Callable[[str], None]) -> bool:
@@ -4,28 +4,68 @@ state_machine.py
 Turns detector results into one state string.
 """
 
-from typing import Dict
+import functools
+from types import SimpleNamespace
+from typing import Dict, List, Sequence, Tuple
 from state_rules import STATE_RULES
 from states import STATE_UNKNOWN
 
+# Rules in priority order (highest first), sorted once at import
+_SORTED_RULES = sorted(STATE_RULES, key=lambda r: r.get("priority", 0), reverse=True)
+
+# Stands in for a None result in resolve_state's dict
+_NOT_FOUND = SimpleNamespace(found=False)
+
+
+@functools.lru_cache(maxsize=16)
+def _resolver_for(detector_names: Tuple[str, ...]) -> "StateResolver":
+    """StateResolver for this detector order, built once per distinct order."""
+    return StateResolver(detector_names)
+
+
 def resolve_state(results: Dict[str, object]) -> str:
     """
     results is your detector results dict:
     results[name].found should be True or False
-    """
 
-    # Evaluate rules in priority order
-    rules = sorted(STATE_RULES, key=lambda r: r.get("priority", 0), reverse=True)
+    Delegates to a (cached) StateResolver over the dict's keys.
+    """
+    return _resolver_for(tuple(results)).resolve(
+        [res or _NOT_FOUND for res in results.values()]
+    )
 
-    for rule in rules:
-        state = rule["state"]
-        require_all = rule.get("require_all", [])
-        require_none = rule.get("require_none", [])
 
-        ok_all = all(results.get(name) and results[name].found for name in require_all)
-        ok_none = all((not results.get(name)) or (not results[name].found) for name in require_none)
+class StateResolver:
+    """
+    Resolves results that come as a tuple (e.g. a namedtuple) in a fixed
+    detector order; resolve_state uses it for dicts too. Detector i is bit
+    1 << i and each rule is turned into two bitmasks once, so resolving reads
+    each result's .found and then only does integer ANDs per rule.
+    """
 
-        if ok_all and ok_none:
-            return state
+    def __init__(self, detector_names: Sequence[str]):
+        bit = {name: 1 << i for i, name in enumerate(detector_names)}
+        self._bits = tuple(bit[name] for name in detector_names)
+        self._rules: List[Tuple[str, int, int]] = []
+        for rule in _SORTED_RULES:
+            require_all = rule.get("require_all", [])
+            # A required detector that isn't registered is never found
+            if any(name not in bit for name in require_all):
+                continue
+            require_none = [name for name in rule.get("require_none", []) if name in bit]
+            self._rules.append((
+                rule["state"],
+                sum(bit[name] for name in set(require_all)),
+                sum(bit[name] for name in set(require_none)),
+            ))
 
-    return STATE_UNKNOWN
+    def resolve(self, results: Sequence[object]) -> str:
+        """State for results given in detector_names order (each has .found)."""
+        found = 0
+        for bit, r in zip(self._bits, results):
+            if r.found:
+                found |= bit
+        for state, require_all, require_none in self._rules:
+            if found & require_all == require_all and not found & require_none:
+                return state
+        return STATE_UNKNOWN
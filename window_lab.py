@@ -1,25 +1,59 @@
+import ctypes
+import queue
 import time
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-import pyautogui
 import win32gui
 import win32con
 import win32api
 
+# Debug log widget keeps at most this many lines
+LOG_MAX_LINES = 2000
+
+# How often the Tk thread drains log lines posted by the Win32 worker
+LOG_QUEUE_POLL_MS = 50
+
+# DwmGetWindowAttribute: DWMWA_CLOAKED is non-zero for windows that are "visible"
+# but not shown (suspended UWP apps, windows on other virtual desktops)
+DWMWA_CLOAKED = 14
+try:
+    _DwmGetWindowAttribute = ctypes.windll.dwmapi.DwmGetWindowAttribute
+except (AttributeError, OSError):
+    _DwmGetWindowAttribute = None
+
 # -------------- helpers --------------
 
+def _is_cloaked(hwnd) -> bool:
+    """True if DWM reports the window as cloaked (False if that can't be asked)."""
+    if _DwmGetWindowAttribute is None:
+        return False
+    cloaked = ctypes.c_int(0)
+    hr = _DwmGetWindowAttribute(
+        ctypes.c_void_p(hwnd), DWMWA_CLOAKED, ctypes.byref(cloaked), ctypes.sizeof(cloaked)
+    )
+    return hr == 0 and cloaked.value != 0
+
+
 def list_visible_windows():
-    """Return list of (hwnd, title) for visible top-level windows with non-empty titles."""
+    """
+    Return list of (hwnd, title) for visible top-level windows with non-empty titles.
+    Tool windows and cloaked windows (not actually on screen) are left out,
+    using cheap style/DWM checks before the title is read.
+    """
     items = []
 
     def enum_cb(hwnd, _):
         if not win32gui.IsWindowVisible(hwnd):
             return
+        if win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE) & win32con.WS_EX_TOOLWINDOW:
+            return
+        if not win32gui.GetWindowTextLength(hwnd) or _is_cloaked(hwnd):
+            return
         title = win32gui.GetWindowText(hwnd).strip()
         if not title:
             return
-        # Skip some common non-app windows if you want, but keep it simple for now
         items.append((hwnd, title))
 
     win32gui.EnumWindows(enum_cb, None)
@@ -33,12 +67,18 @@ def get_window_rect(hwnd):
     return win32gui.GetWindowRect(hwnd)
 
 
+def restore_if_needed(hwnd):
+    """SW_RESTORE only a minimized or maximized window; a normal one is left alone."""
+    if win32gui.GetWindowPlacement(hwnd)[1] in (win32con.SW_SHOWMINIMIZED, win32con.SW_SHOWMAXIMIZED):
+        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+
+
 def bring_to_front(hwnd):
     """
     Bring window to foreground. Windows can be picky; this is a best-effort sequence.
     """
     try:
-        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+        restore_if_needed(hwnd)
         win32gui.SetForegroundWindow(hwnd)
     except Exception:
         # Fallback: attach thread input to bypass foreground restrictions sometimes
@@ -57,7 +97,7 @@ def move_resize(hwnd, left, top, width, height):
     """
     Move + resize a window. This uses the full window rect, not strictly client area.
     """
-    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+    restore_if_needed(hwnd)
     win32gui.SetWindowPos(
         hwnd,
         None,
@@ -94,9 +134,8 @@ def toggle_alt_enter():
     Sends Alt+Enter to toggle windowed/fullscreen for many games.
     Must have the target window in the foreground.
     """
-    pyautogui.keyDown("alt")
-    pyautogui.press("enter")
-    pyautogui.keyUp("alt")
+    from clicker import send_alt_enter
+    send_alt_enter()
 
 
 # -------------- tiny UI --------------
@@ -109,6 +148,13 @@ class WindowLab(tk.Tk):
 
         self.windows = []
         self.selected_hwnd = None
+        # (whole second, "HH:MM:SS" for it) so _log formats the clock once per second
+        self._log_second = (-1, "")
+        # Win32 calls that sleep or wait on the target window run here so the
+        # Tk event loop keeps painting. Tk is not thread-safe, so the worker only
+        # puts log lines on log_queue and the Tk thread drains it (_pump_log_queue).
+        self._win32_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="win32")
+        self.log_queue: "queue.Queue[str]" = queue.Queue()
 
         top = ttk.Frame(self, padding=10)
         top.pack(fill="x")
@@ -153,12 +199,43 @@ class WindowLab(tk.Tk):
         self.log.pack(fill="both", expand=True)
 
         self.refresh_windows()
+        self.after(LOG_QUEUE_POLL_MS, self._pump_log_queue)
 
     def _log(self, msg):
-        ts = time.strftime("%H:%M:%S")
+        sec = int(time.time())
+        cached_sec, ts = self._log_second
+        if sec != cached_sec:
+            ts = time.strftime("%H:%M:%S", time.localtime(sec))
+            self._log_second = (sec, ts)
         self.log.insert("end", f"[{ts}] {msg}\n")
+
+        # Keep only the newest LOG_MAX_LINES lines; Tk Text gets slow when it grows forever
+        lines = int(self.log.index("end-1c").split(".")[0]) - 1
+        if lines > LOG_MAX_LINES:
+            self.log.delete("1.0", f"{lines - LOG_MAX_LINES + 1}.0")
+
         self.log.see("end")
 
+    def _run_win32(self, fn, *args, done_msg):
+        """Run fn(*args) on the Win32 worker and log done_msg (or the error) on the Tk thread."""
+        def job():
+            try:
+                fn(*args)
+                msg = done_msg
+            except Exception as e:
+                msg = f"{getattr(fn, '__name__', 'win32 call')} failed: {e}"
+            self.log_queue.put(msg)
+        self._win32_pool.submit(job)
+
+    def _pump_log_queue(self):
+        """Log the lines the Win32 worker posted; runs on the Tk thread every LOG_QUEUE_POLL_MS."""
+        try:
+            while True:
+                self._log(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        self.after(LOG_QUEUE_POLL_MS, self._pump_log_queue)
+
     def refresh_windows(self):
         self.windows = list_visible_windows()
         labels = [title for _, title in self.windows]
@@ -184,8 +261,7 @@ class WindowLab(tk.Tk):
 
     def do_front(self):
         self._require_hwnd()
-        bring_to_front(self.selected_hwnd)
-        self._log("Bring to front requested.")
+        self._run_win32(bring_to_front, self.selected_hwnd, done_msg="Bring to front requested.")
 
     def do_rect(self):
         self._require_hwnd()
@@ -194,10 +270,14 @@ class WindowLab(tk.Tk):
 
     def do_alt_enter(self):
         self._require_hwnd()
-        bring_to_front(self.selected_hwnd)
+        self._run_win32(self._front_then_alt_enter, self.selected_hwnd,
+                        done_msg="Sent Alt+Enter. (Window must support this toggle.)")
+
+    @staticmethod
+    def _front_then_alt_enter(hwnd):
+        bring_to_front(hwnd)
         time.sleep(0.15)
         toggle_alt_enter()
-        self._log("Sent Alt+Enter. (Window must support this toggle.)")
 
     def do_move_monitor(self):
         self._require_hwnd()
@@ -214,19 +294,17 @@ class WindowLab(tk.Tk):
         width = m["width"] - inset * 2
         height = m["height"] - inset * 2
 
-        move_resize(self.selected_hwnd, left, top, width, height)
-        self._log(f"Moved/resized to {idx+1}: ({left},{top}) {width}x{height}")
+        self._run_win32(move_resize, self.selected_hwnd, left, top, width, height,
+                        done_msg=f"Moved/resized to {idx+1}: ({left},{top}) {width}x{height}")
 
     def do_apply_size(self):
         self._require_hwnd()
         l, t, r, b = get_window_rect(self.selected_hwnd)
         w = int(self.w_var.get())
         h = int(self.h_var.get())
-        move_resize(self.selected_hwnd, l, t, w, h)
-        self._log(f"Applied size {w}x{h} at top-left ({l},{t}).")
+        self._run_win32(move_resize, self.selected_hwnd, l, t, w, h,
+                        done_msg=f"Applied size {w}x{h} at top-left ({l},{t}).")
 
 
 if __name__ == "__main__":
-    # PyAutoGUI safety: slam mouse to top-left to abort if it goes nuts
-    pyautogui.FAILSAFE = True
     WindowLab().mainloop()
@@ -23,18 +23,12 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass
-from typing import Optional, Tuple
-
-import mss  # used to read monitor geometry in the same coordinate system as screen capture
+from typing import Callable, Dict, List, Optional, Tuple
 
 import win32gui
 import win32con
 import win32api
 
-# Optional but very helpful for toggling windowed mode (Alt+Enter)
-# If you do not want it, you can remove it and skip the toggle function.
-import pyautogui
-
 # Load config for debug settings
 from config_loader import load_config
 
@@ -49,7 +43,7 @@ except Exception:
 # Data models (simple and clear)
 # ----------------------------
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WindowStatus:
     """
     A snapshot describing whether the target window is in the desired state.
@@ -75,7 +69,7 @@ class WindowStatus:
     looks_fullscreen_like: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class EnforceConfig:
     """
     All settings that define the desired window state.
@@ -105,6 +99,8 @@ class EnforceConfig:
 
     # Sleep timing
     # Tiny sleeps help Windows repaint and apply the move/resize reliably.
+    # Activate, move and resize poll for the change and only wait this long
+    # at most (see _wait_until); the Alt+Enter toggle always sleeps in full.
     post_activate_sleep_s: float = 0.05
     post_move_sleep_s: float = 0.05
     post_resize_sleep_s: float = 0.10
@@ -115,6 +111,18 @@ class EnforceConfig:
 # Window finding
 # ----------------------------
 
+# Lowercased title substring -> hwnd find_window_by_title_contains returned last
+_last_found_hwnd: Dict[str, int] = {}
+
+
+class _WindowFound(Exception):
+    """Raised from an EnumWindows callback to stop the enumeration at a match."""
+
+    def __init__(self, hwnd: int):
+        super().__init__(hwnd)
+        self.hwnd = hwnd
+
+
 def find_window_by_title_contains(title_contains: str) -> Optional[int]:
     """
     Find the first visible top-level window whose title contains the given substring.
@@ -122,31 +130,69 @@ def find_window_by_title_contains(title_contains: str) -> Optional[int]:
     Many games have dynamic titles. Using "contains" is often more reliable than exact match.
     """
     title_contains_lower = title_contains.lower().strip()
+
+    # Usually the window found last time is still there: three cheap calls
+    # instead of reading the title of every top-level window.
+    hwnd = _last_found_hwnd.get(title_contains_lower)
+    if hwnd is not None and _title_still_matches(hwnd, title_contains_lower):
+        return hwnd
+
     found_hwnd: Optional[int] = None
 
     def enum_cb(hwnd, _):
-        nonlocal found_hwnd
-        if found_hwnd is not None:
-            return  # already found one
-
         if not win32gui.IsWindowVisible(hwnd):
             return
+        # Skip untitled windows without building a title string
+        if not win32gui.GetWindowTextLength(hwnd):
+            return
 
         title = win32gui.GetWindowText(hwnd).strip()
         if not title:
             return
 
         if title_contains_lower in title.lower():
-            found_hwnd = hwnd
+            # pywin32 passes the exception out of EnumWindows, which ends the
+            # enumeration here instead of calling back for every remaining window
+            raise _WindowFound(hwnd)
 
-    win32gui.EnumWindows(enum_cb, None)
+    try:
+        win32gui.EnumWindows(enum_cb, None)
+    except _WindowFound as found:
+        found_hwnd = found.hwnd
+
+    if found_hwnd is None:
+        _last_found_hwnd.pop(title_contains_lower, None)
+    else:
+        _last_found_hwnd[title_contains_lower] = found_hwnd
     return found_hwnd
 
 
+def _title_still_matches(hwnd: int, title_contains_lower: str) -> bool:
+    """True if hwnd is still a visible window whose title contains title_contains_lower."""
+    try:
+        return (
+            bool(win32gui.IsWindow(hwnd))
+            and bool(win32gui.IsWindowVisible(hwnd))
+            and title_contains_lower in win32gui.GetWindowText(hwnd).strip().lower()
+        )
+    except Exception:
+        return False
+
+
 # ----------------------------
 # Monitor geometry helpers
 # ----------------------------
 
+# Monitor rects read through MSS, reused for MONITOR_RECT_TTL_S.
+# ensure_window asks up to three times per call, and each MSS instance
+# sets up GDI handles and enumerates every monitor, so one read caches them all.
+# The EnumDisplayMonitors list used by window_looks_spanning_monitors is kept
+# for the same time.
+MONITOR_RECT_TTL_S = 5.0
+_monitor_rects: Tuple[float, List[Tuple[int, int, int, int]]] = (0.0, [])
+_display_monitor_rects: Tuple[float, List[Tuple[int, int, int, int]]] = (0.0, [])
+
+
 def get_monitor_rect_mss(monitor_index: int) -> Tuple[int, int, int, int]:
     """
     Return the monitor rectangle (left, top, right, bottom) using MSS.
@@ -158,13 +204,34 @@ def get_monitor_rect_mss(monitor_index: int) -> Tuple[int, int, int, int]:
     MSS monitor dict:
     - left, top, width, height
     """
-    with mss.mss() as sct:
-        mon = sct.monitors[monitor_index]
-        l = int(mon["left"])
-        t = int(mon["top"])
-        r = l + int(mon["width"])
-        b = t + int(mon["height"])
-        return (l, t, r, b)
+    global _monitor_rects
+
+    now = time.monotonic()
+    ts, rects = _monitor_rects
+    if not rects or now - ts >= MONITOR_RECT_TTL_S:
+        import mss  # imported here so config-only importers do not pay for it
+
+        with mss.mss() as sct:
+            rects = []
+            for mon in sct.monitors:
+                l = int(mon["left"])
+                t = int(mon["top"])
+                rects.append((l, t, l + int(mon["width"]), t + int(mon["height"])))
+        _monitor_rects = (now, rects)
+
+    return rects[monitor_index]
+
+
+def _get_display_monitor_rects() -> List[Tuple[int, int, int, int]]:
+    """Every monitor rect from EnumDisplayMonitors, cached for MONITOR_RECT_TTL_S."""
+    global _display_monitor_rects
+
+    now = time.monotonic()
+    ts, rects = _display_monitor_rects
+    if not rects or now - ts >= MONITOR_RECT_TTL_S:
+        rects = [tuple(rect) for _hmon, _hdc, rect in win32api.EnumDisplayMonitors()]
+        _display_monitor_rects = (now, rects)
+    return rects
 
 
 def rect_center(rect: Tuple[int, int, int, int]) -> Tuple[int, int]:
@@ -198,17 +265,23 @@ def rect_intersect(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -
     return (l, t, r, btm)
 
 
-def window_is_on_monitor(hwnd: int, monitor_rect: Tuple[int, int, int, int]) -> bool:
+def window_is_on_monitor(
+    hwnd: int,
+    monitor_rect: Tuple[int, int, int, int],
+    win_rect: Optional[Tuple[int, int, int, int]] = None,
+) -> bool:
     """
     Decide if a window is "on" a monitor by checking where its center point lands.
     This is simple and works well for your use case.
+    Pass win_rect if the caller already has GetWindowRect(hwnd).
     """
-    win_rect = win32gui.GetWindowRect(hwnd)
+    if win_rect is None:
+        win_rect = win32gui.GetWindowRect(hwnd)
     cx, cy = rect_center(win_rect)
     return point_in_rect(cx, cy, monitor_rect)
 
 
-def window_looks_spanning_monitors(hwnd: int) -> bool:
+def window_looks_spanning_monitors(hwnd: int, win_rect: Optional[Tuple[int, int, int, int]] = None) -> bool:
     """
     Heuristic check: does the window overlap multiple monitors significantly?
 
@@ -217,12 +290,12 @@ def window_looks_spanning_monitors(hwnd: int) -> bool:
     We approximate using overlap areas with each monitor rect.
 
     If overlap on 2nd best monitor is large relative to best, call it spanning.
+    Pass win_rect if the caller already has GetWindowRect(hwnd).
     """
-    win_rect = win32gui.GetWindowRect(hwnd)
+    if win_rect is None:
+        win_rect = win32gui.GetWindowRect(hwnd)
 
-    monitors = []
-    for hmon, hdc, rect in win32api.EnumDisplayMonitors():
-        monitors.append(rect)
+    monitors = _get_display_monitor_rects()
 
     overlaps = [rect_area(rect_intersect(win_rect, m)) for m in monitors]
     overlaps_sorted = sorted(overlaps, reverse=True)
@@ -244,6 +317,19 @@ def window_looks_spanning_monitors(hwnd: int) -> bool:
 # Window mode and activation
 # ----------------------------
 
+def needs_restore(hwnd: int) -> bool:
+    """
+    True if the window is minimized or maximized, i.e. ShowWindow(SW_RESTORE)
+    would change it. Restoring a normal window still makes it handle a
+    WM_SIZE / WM_WINDOWPOSCHANGING round trip, so callers skip it then.
+    """
+    try:
+        show_cmd = win32gui.GetWindowPlacement(hwnd)[1]
+    except Exception:
+        return True
+    return show_cmd in (win32con.SW_SHOWMINIMIZED, win32con.SW_SHOWMAXIMIZED)
+
+
 def activate_window(hwnd: int) -> bool:
     """
     Bring window to foreground (active).
@@ -254,14 +340,35 @@ def activate_window(hwnd: int) -> bool:
     Returns True if it ended up as foreground window.
     """
     try:
-        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+        if win32gui.GetForegroundWindow() == hwnd and not win32gui.IsIconic(hwnd):
+            return True
+    except Exception:
+        pass
+
+    try:
+        if needs_restore(hwnd):
+            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
     except Exception:
         pass
 
     try:
         win32gui.SetForegroundWindow(hwnd)
     except Exception:
-        # Fallback: sometimes attaching thread input helps
+        pass
+    if win32gui.GetForegroundWindow() == hwnd:
+        return True
+
+    # The foreground lock refused us. A key event from this process counts as
+    # the "last input", which lifts the lock, so tap Alt and try again.
+    try:
+        win32api.keybd_event(win32con.VK_MENU, 0, 0, 0)
+        win32api.keybd_event(win32con.VK_MENU, 0, win32con.KEYEVENTF_KEYUP, 0)
+        win32gui.SetForegroundWindow(hwnd)
+    except Exception:
+        pass
+
+    if win32gui.GetForegroundWindow() != hwnd:
+        # Last fallback: sometimes attaching thread input helps
         try:
             fg = win32gui.GetForegroundWindow()
             cur_tid = win32api.GetCurrentThreadId()
@@ -275,7 +382,11 @@ def activate_window(hwnd: int) -> bool:
     return win32gui.GetForegroundWindow() == hwnd
 
 
-def looks_fullscreen_like(hwnd: int, monitor_rect: Tuple[int, int, int, int]) -> bool:
+def looks_fullscreen_like(
+    hwnd: int,
+    monitor_rect: Tuple[int, int, int, int],
+    win_rect: Optional[Tuple[int, int, int, int]] = None,
+) -> bool:
     """
     Heuristic check for fullscreen or borderless fullscreen.
 
@@ -283,12 +394,13 @@ def looks_fullscreen_like(hwnd: int, monitor_rect: Tuple[int, int, int, int]) ->
     If the window occupies most of the monitor, we treat it as fullscreen-like.
 
     This is not perfect but it is very effective in practice.
+    Pass win_rect if the caller already has GetWindowRect(hwnd).
     """
     ml, mt, mr, mb = monitor_rect
     mw = mr - ml
     mh = mb - mt
 
-    wl, wt, wr, wb = win32gui.GetWindowRect(hwnd)
+    wl, wt, wr, wb = win_rect if win_rect is not None else win32gui.GetWindowRect(hwnd)
     ww = wr - wl
     wh = wb - wt
 
@@ -317,7 +429,10 @@ def try_alt_enter_toggle(hwnd: int, cfg: EnforceConfig, log_fn) -> None:
     time.sleep(0.10)
 
     try:
-        pyautogui.hotkey("alt", "enter")
+        # Alt+Enter as four SendInput key events.
+        # Imported lazily so config-only importers do not load the Win32 input setup.
+        from clicker import send_alt_enter
+        send_alt_enter()
         # log_fn("[window] sent Alt+Enter toggle")
     except Exception as e:
         # log_fn(f"[window] Alt+Enter failed: {type(e).__name__}: {e}")
@@ -378,10 +493,46 @@ def resize_window_to_target_client(hwnd: int, target_client_w: int, target_clien
 # Status check and enforcement
 # ----------------------------
 
+# Poll interval while waiting for Windows to apply an activate, move or resize
+APPLY_POLL_S = 0.005
+
+
+def _wait_until(done: Callable[[], bool], timeout_s: float) -> bool:
+    """
+    Call done() every APPLY_POLL_S until it returns True or timeout_s has passed.
+    Used instead of a fixed sleep after a window change: most changes are
+    visible within a few ms, and timeout_s stays the upper bound.
+    """
+    deadline = time.perf_counter() + timeout_s
+    while True:
+        try:
+            if done():
+                return True
+        except Exception:
+            pass
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        time.sleep(min(APPLY_POLL_S, remaining))
+
+
+# Adaptive backoff for ensure_window in a polling loop.
+# Every run that found the window already correct grows the skip budget
+# (x ENSURE_SKIP_GROWTH, at most ENSURE_SKIP_MAX). That many following calls
+# return the steady status after only the window_status_still_valid check.
+# Any step that had to act, or a window that is gone, resets the budget to 0.
+ENSURE_SKIP_GROWTH = 1.5
+ENSURE_SKIP_MAX = 30.0
+_steady_status: Optional[WindowStatus] = None
+_steady_cfg: Optional[EnforceConfig] = None
+_skip_budget = 0.0
+_skip_count = 0
+
 def get_window_status(hwnd: int, cfg: EnforceConfig) -> WindowStatus:
     """
     Build a structured status object describing current window state.
     This makes debugging and learning easier than juggling many variables.
+    The window rect is read once and shared by all the checks below.
     """
     title = win32gui.GetWindowText(hwnd).strip()
     win_rect = win32gui.GetWindowRect(hwnd)
@@ -392,9 +543,9 @@ def get_window_status(hwnd: int, cfg: EnforceConfig) -> WindowStatus:
     fg = win32gui.GetForegroundWindow()
     is_fg = (fg == hwnd)
 
-    on_mon = window_is_on_monitor(hwnd, mon_rect)
-    spanning = window_looks_spanning_monitors(hwnd)
-    full_like = looks_fullscreen_like(hwnd, mon_rect)
+    on_mon = window_is_on_monitor(hwnd, mon_rect, win_rect)
+    spanning = window_looks_spanning_monitors(hwnd, win_rect)
+    full_like = looks_fullscreen_like(hwnd, mon_rect, win_rect)
 
     return WindowStatus(
         hwnd=hwnd,
@@ -419,76 +570,101 @@ def ensure_window(cfg: EnforceConfig, log_fn) -> Optional[WindowStatus]:
     - return final status
 
     It is designed to be safe to call often.
-    Most calls will do almost nothing once the window is already correct.
+    Most calls will do almost nothing once the window is already correct,
+    and while it stays correct calls are skipped (see ENSURE_SKIP_GROWTH).
     """
+    global _steady_status, _steady_cfg, _skip_budget, _skip_count
+
+    steady = _steady_status
+    if (
+        steady is not None
+        and _skip_count < int(_skip_budget)
+        and cfg == _steady_cfg
+        and window_status_still_valid(steady)
+    ):
+        _skip_count += 1
+        return steady
+    _skip_count = 0
+
     hwnd = find_window_by_title_contains(cfg.title_contains)
     if not hwnd:
         if DEBUG_WINDOW_PRINT:
             log_fn(f"[window] NOT FOUND title contains: '{cfg.title_contains}'")
+        _steady_status = None
+        _skip_budget = 0.0
         return None
 
-    # First snapshot
+    # First snapshot. It is only taken again after a step below changed
+    # something, so a window that is already correct costs one snapshot.
     st = get_window_status(hwnd, cfg)
+    acted = False
 
     # 1) Activate if needed
     if not st.is_foreground:
+        acted = True
         ok = activate_window(hwnd)
         if DEBUG_WINDOW_PRINT:
             log_fn(f"[window] activated ok={ok}")
-        time.sleep(cfg.post_activate_sleep_s)
+        _wait_until(lambda: win32gui.GetForegroundWindow() == hwnd, cfg.post_activate_sleep_s)
 
-    # Refresh status after activation
-    st = get_window_status(hwnd, cfg)
+        # Refresh status after activation
+        st = get_window_status(hwnd, cfg)
 
     # 2) If it looks fullscreen or borderless fullscreen, try toggling to windowed mode
-    if st.looks_fullscreen_like:
+    if st.looks_fullscreen_like and cfg.try_alt_enter_to_escape_fullscreen:
         # log_fn("[window] looks fullscreen-like, attempting to toggle to windowed mode")
         try_alt_enter_toggle(hwnd, cfg, log_fn)
+        acted = True
 
-    # Refresh status after possible mode toggle
-    st = get_window_status(hwnd, cfg)
-
-    # 3) Ensure on target monitor (by center point)
-    if not st.is_on_target_monitor or st.looks_spanning_monitors:
-        mon_rect = get_monitor_rect_mss(cfg.monitor_index)
-        ml, mt, mr, mb = mon_rect
-
-        # We position it near top-left of the desired monitor with padding.
-        x = ml + cfg.pad_left
-        y = mt + cfg.pad_top
-
-        # Move only (keep current size) using SWP_NOSIZE
-        win32gui.SetWindowPos(
-            hwnd,
-            None,
-            int(x), int(y),
-            0, 0,
-            win32con.SWP_NOSIZE | win32con.SWP_NOZORDER | win32con.SWP_NOOWNERZORDER | win32con.SWP_SHOWWINDOW
-        )
-        # log_fn(f"[window] moved to monitor {cfg.monitor_index} at ({x},{y})")
-        time.sleep(cfg.post_move_sleep_s)
-
-    # Refresh status after move
-    st = get_window_status(hwnd, cfg)
+        # Refresh status after the mode toggle
+        st = get_window_status(hwnd, cfg)
 
-    # 4) Ensure client size matches target
+    # 3) + 4) Ensure on target monitor (by center point) and client size matches target.
+    # resize_window_to_target_client also places the window, so when the size is
+    # already wrong a single SetWindowPos does both. A window that only sits on the
+    # wrong monitor gets a move-only SetWindowPos, and its client size is checked
+    # again afterwards: moving to a monitor with a different DPI can change it.
     cw, ch = st.client_size
     tw, th = cfg.target_client_w, cfg.target_client_h
     tol = cfg.size_tolerance_px
 
     size_ok = (abs(cw - tw) <= tol) and (abs(ch - th) <= tol)
+    needs_move = not st.is_on_target_monitor or st.looks_spanning_monitors
 
-    if not size_ok:
+    if needs_move or not size_ok:
+        acted = True
         mon_rect = get_monitor_rect_mss(cfg.monitor_index)
         ml, mt, mr, mb = mon_rect
+
+        # We position it near top-left of the desired monitor with padding.
         x = ml + cfg.pad_left
         y = mt + cfg.pad_top
 
-        resize_window_to_target_client(hwnd, tw, th, x, y, log_fn)
-        time.sleep(cfg.post_resize_sleep_s)
+        def resized() -> bool:
+            w, h = get_client_size(hwnd)
+            return abs(w - tw) <= tol and abs(h - th) <= tol
 
-    # Final status after enforcement attempts
-    st = get_window_status(hwnd, cfg)
+        if size_ok:
+            # Move only (keep current size) using SWP_NOSIZE
+            win32gui.SetWindowPos(
+                hwnd,
+                None,
+                int(x), int(y),
+                0, 0,
+                win32con.SWP_NOSIZE | win32con.SWP_NOZORDER | win32con.SWP_NOOWNERZORDER | win32con.SWP_SHOWWINDOW
+            )
+            # log_fn(f"[window] moved to monitor {cfg.monitor_index} at ({x},{y})")
+            _wait_until(lambda: tuple(win32gui.GetWindowRect(hwnd)[:2]) == (int(x), int(y)), cfg.post_move_sleep_s)
+
+            # The move itself may have changed the client size (DPI change)
+            size_ok = resized()
+
+        if not size_ok:
+            resize_window_to_target_client(hwnd, tw, th, x, y, log_fn)
+            _wait_until(resized, cfg.post_resize_sleep_s)
+
+        # Final status after the move / resize
+        st = get_window_status(hwnd, cfg)
 
     # Log final summary in a readable way
     if DEBUG_WINDOW_PRINT:
@@ -501,4 +677,30 @@ def ensure_window(cfg: EnforceConfig, log_fn) -> Optional[WindowStatus]:
             f"fullscreen_like={st.looks_fullscreen_like}"
         )
 
+    if acted:
+        _steady_status = None
+        _skip_budget = 0.0
+    else:
+        _steady_status = st
+        _steady_cfg = cfg
+        _skip_budget = min(max(_skip_budget * ENSURE_SKIP_GROWTH, 1.0), ENSURE_SKIP_MAX)
+
     return st
+
+
+def window_status_still_valid(st: WindowStatus) -> bool:
+    """
+    Cheap re-check of a WindowStatus from an earlier ensure_window call.
+
+    Only three Win32 calls (no window enumeration, no monitor lookups):
+    the window still exists, is still in the foreground and has not moved.
+    If any of these fail, the caller should run ensure_window again.
+    """
+    try:
+        return (
+            bool(win32gui.IsWindow(st.hwnd))
+            and win32gui.GetForegroundWindow() == st.hwnd
+            and tuple(win32gui.GetWindowRect(st.hwnd)) == tuple(st.win_rect)
+        )
+    except Exception:
+        return False